@@ -7,6 +7,8 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import Optional, Dict
 
+from sqlalchemy import text
+
 # Use the engine from db, but the Base from models (ensures all tables are registered)
 from .db import engine
 from .models import Role, User, Base
@@ -81,6 +83,23 @@ class App(tk.Tk):
 
         # ---- Ensure DB schema exists (models' Base so all tables are present)
         Base.metadata.create_all(bind=engine)
+        # create_all() skips indexes on tables that already exist, so databases made
+        # before an index was declared (e.g. ix_appt_doctor_dt_status) never get it; add them here
+        for table in Base.metadata.sorted_tables:
+            for ix in table.indexes:
+                try:
+                    ix.create(bind=engine, checkfirst=True)
+                except Exception as e:  # e.g. unique index over pre-existing duplicates
+                    print(f"[App] index {ix.name} not created: {e}")
+                    traceback.print_exc()
+        # ix_appt_doctor_dt (doctor_id, scheduled_for) is a prefix of ix_appt_doctor_dt_status
+        # and no longer declared; drop it from older databases so writes stop maintaining it
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("DROP INDEX IF EXISTS ix_appt_doctor_dt"))
+        except Exception as e:
+            print(f"[App] old index ix_appt_doctor_dt not dropped: {e}")
+            traceback.print_exc()
 
         # ---- Session
         self.current_user: Optional[User] = None
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import os
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 # ------------------------------------------------------------------
@@ -19,6 +20,21 @@ engine = create_engine(
     future=True
 )
 
+# SQLite tuning for a read-heavy desktop UI: WAL lets dashboard reads proceed
+# while another window commits; the rest keeps hot pages in memory.
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_conn, _conn_record):
+        cur = dbapi_conn.cursor()
+        try:
+            cur.execute("PRAGMA journal_mode=WAL")
+            cur.execute("PRAGMA synchronous=NORMAL")
+            cur.execute("PRAGMA temp_store=MEMORY")
+            cur.execute("PRAGMA mmap_size=268435456")
+            cur.execute("PRAGMA cache_size=-65536")
+        finally:
+            cur.close()
+
 SessionLocal = sessionmaker(
     bind=engine,
     autoflush=False,
@@ -27,6 +43,31 @@ SessionLocal = sessionmaker(
     future=True
 )
 
+# ------------------------------------------------------------------
+# Debug: statement counter (N+1 budget checks)
+# ------------------------------------------------------------------
+@contextmanager
+def count_queries(bind=None):
+    """
+    Collect every SQL statement executed on `bind` (default: the app engine)
+    while the block runs, e.g.
+
+        with count_queries() as q:
+            frame._refresh_schedule()
+        assert len(q) <= 3, q
+    """
+    target = bind if bind is not None else engine
+    statements: list[str] = []
+
+    def _before(_conn, _cursor, statement, _params, _context, _executemany):
+        statements.append(statement)
+
+    event.listen(target, "before_cursor_execute", _before)
+    try:
+        yield statements
+    finally:
+        event.remove(target, "before_cursor_execute", _before)
+
 # ------------------------------------------------------------------
 # Declarative Base
 # ------------------------------------------------------------------
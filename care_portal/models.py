@@ -152,15 +152,15 @@ class Doctor(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), unique=True)
 
-    license_no: Mapped[str] = mapped_column(String(64), default="")
-    specialty: Mapped[str] = mapped_column(String(128), default="General")
-    designation: Mapped[str] = mapped_column(String(128), default="")
-    years_exp: Mapped[int] = mapped_column(Integer, default=0)
-    employee_id: Mapped[str] = mapped_column(String(64), default="")
-    degree: Mapped[str] = mapped_column(String(128), default="")
-    university: Mapped[str] = mapped_column(String(128), default="")
-    certifications: Mapped[str] = mapped_column(Text, default="")
-    work_address: Mapped[str] = mapped_column(Text, default="")
+    license_no: Mapped[str] = mapped_column(String(64), default="", server_default="")
+    specialty: Mapped[str] = mapped_column(String(128), default="General", server_default="General")
+    designation: Mapped[str] = mapped_column(String(128), default="", server_default="")
+    years_exp: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    employee_id: Mapped[str] = mapped_column(String(64), default="", server_default="")
+    degree: Mapped[str] = mapped_column(String(128), default="", server_default="")
+    university: Mapped[str] = mapped_column(String(128), default="", server_default="")
+    certifications: Mapped[str] = mapped_column(Text, default="", server_default="")
+    work_address: Mapped[str] = mapped_column(Text, default="", server_default="")
 
     user: Mapped["User"] = relationship("User", back_populates="doctor")
     appointments: Mapped[list["Appointment"]] = relationship("Appointment", back_populates="doctor")
@@ -265,8 +265,9 @@ class Appointment(Base):
 
 # Unique (doctor, exact datetime) to guarantee an exclusive slot
 Index("uq_appt_doctor_datetime", Appointment.doctor_id, Appointment.scheduled_for, unique=True)
-# Range-friendly indexes
-Index("ix_appt_doctor_dt", Appointment.doctor_id, Appointment.scheduled_for)
+# Range-friendly indexes; status rides along so the conflict check and the KPI
+# counts (doctor + time + status != cancelled) are answered from the index alone
+Index("ix_appt_doctor_dt_status", Appointment.doctor_id, Appointment.scheduled_for, Appointment.status)
 Index("ix_appt_patient_dt", Appointment.patient_id, Appointment.scheduled_for)
 
 class AttendanceMethod(str, enum.Enum):
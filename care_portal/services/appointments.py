@@ -5,8 +5,9 @@ from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
 
-from sqlalchemy import and_, func, select
+from sqlalchemy import and_, select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
 
 from ..db import SessionLocal
 from ..models import (
@@ -14,6 +15,7 @@ from ..models import (
     AppointmentStatus,
     Doctor,
     DoctorAvailability,
+    Patient,
 )
 from .notifications import notify_receptionists_about_request
 
@@ -44,6 +46,10 @@ class AppointmentService:
         with SessionLocal() as db:
             stmt = (
                 select(Appointment)
+                .options(
+                    selectinload(Appointment.patient).selectinload(Patient.user),
+                    selectinload(Appointment.doctor).selectinload(Doctor.user),
+                )
                 .where(
                     Appointment.doctor_id == doctor_id,
                     Appointment.scheduled_for >= day0,
@@ -79,7 +85,8 @@ class AppointmentService:
             av = db.scalar(
                 select(DoctorAvailability).where(
                     DoctorAvailability.doctor_id == doctor_id,
-                    func.date(DoctorAvailability.day) == func.date(day0),
+                    DoctorAvailability.day >= day0,
+                    DoctorAvailability.day < day0 + timedelta(days=1),
                 )
             )
             if not av:
@@ -110,7 +117,8 @@ class AppointmentService:
             av = db.scalar(
                 select(DoctorAvailability).where(
                     DoctorAvailability.doctor_id == doctor_id,
-                    func.date(DoctorAvailability.day) == func.date(day0),
+                    DoctorAvailability.day >= day0,
+                    DoctorAvailability.day < day0 + timedelta(days=1),
                 )
             )
             if av:
@@ -167,7 +175,8 @@ class AppointmentService:
                 select(DoctorAvailability)
                 .where(
                     DoctorAvailability.doctor_id == doctor_id,
-                    func.date(DoctorAvailability.day) == func.date(day_start),
+                    DoctorAvailability.day >= day_start,
+                    DoctorAvailability.day < next_day,
                 )
                 .order_by(DoctorAvailability.id.desc())
             )
@@ -282,7 +291,8 @@ class AppointmentService:
                 select(Appointment.id).where(
                     Appointment.patient_id == patient_id,
                     Appointment.doctor_id == doctor_id,
-                    func.date(Appointment.scheduled_for) == when.date(),
+                    Appointment.scheduled_for >= day0,
+                    Appointment.scheduled_for < day0 + timedelta(days=1),
                     Appointment.status.in_((AppointmentStatus.booked, AppointmentStatus.completed)),
                 )
             ).first()
@@ -405,7 +415,8 @@ class AppointmentService:
                 select(Appointment.id).where(
                     Appointment.patient_id == ap.patient_id,
                     Appointment.doctor_id == ap.doctor_id,
-                    func.date(Appointment.scheduled_for) == new_when.date(),
+                    Appointment.scheduled_for >= day0,
+                    Appointment.scheduled_for < day0 + timedelta(days=1),
                     Appointment.id != appointment_id,
                     Appointment.status.in_((AppointmentStatus.booked, AppointmentStatus.completed)),
                 )
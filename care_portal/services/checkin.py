@@ -1,14 +1,17 @@
 # care_portal/services/checkin.py
 from __future__ import annotations
 
+from contextlib import nullcontext
 from datetime import datetime, timedelta
 from typing import List, Optional, Union
 
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import String, func, select, type_coerce
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, selectinload
 
 from ..db import SessionLocal
 from ..models import (
+    User,
     StaffCheckin,
     StaffCheckinStatus,
     StaffCheckinMethod,
@@ -117,13 +120,14 @@ def _today_range():
 # Public API (optimized, index-friendly)
 # -------------------------------------------------------------------
 
-def today_checkins() -> List[StaffCheckin]:
+def today_checkins(db: Optional[Session] = None) -> List[StaffCheckin]:
     """
     Return today's check-in/out events (with user eager-loaded) as a LIST.
     Uses index-friendly timestamp range filtering.
+    Pass `db` to run on a caller's session instead of opening a new one.
     """
     day0, day1 = _today_range()
-    with SessionLocal() as db:
+    with (nullcontext(db) if db is not None else SessionLocal()) as db:
         rows = db.scalars(
             select(StaffCheckin)
             .options(selectinload(StaffCheckin.user))
@@ -136,6 +140,34 @@ def today_checkins() -> List[StaffCheckin]:
         ).all()
     return rows
 
+def today_checkin_rows(db: Optional[Session] = None) -> List[Row]:
+    """
+    Today's check-in/out events as plain table rows:
+    (ts, who, role, status, method, location).
+    `who` falls back to the email; status/method come back as their stored
+    strings, so callers can display the row without touching ORM objects.
+    """
+    day0, day1 = _today_range()
+    with (nullcontext(db) if db is not None else SessionLocal()) as db:
+        rows = db.execute(
+            select(
+                StaffCheckin.ts,
+                func.coalesce(User.full_name, User.email, "Unknown").label("who"),
+                StaffCheckin.role,
+                type_coerce(StaffCheckin.status, String).label("status"),
+                type_coerce(StaffCheckin.method, String).label("method"),
+                func.coalesce(StaffCheckin.location, "").label("location"),
+            )
+            .outerjoin(User, User.id == StaffCheckin.user_id)
+            .where(
+                StaffCheckin.ts >= day0,
+                StaffCheckin.ts < day1,
+                StaffCheckin.status.in_(_allowed_statuses()),
+            )
+            .order_by(StaffCheckin.ts.asc())
+        ).all()
+    return rows
+
 def today_checkin_by_user(user_id: int) -> List[StaffCheckin]:
     """
     Return today's check-in/out events for this user as a LIST.
@@ -4,7 +4,7 @@ from __future__ import annotations
 from typing import Any, Iterable
 from datetime import datetime
 
-from sqlalchemy import select, func
+from sqlalchemy import select, func, insert
 from sqlalchemy.exc import SQLAlchemyError
 
 from ..db import SessionLocal
@@ -99,14 +99,13 @@ def send_bulk_notifications(
         db = SessionLocal()
         close = True
 
-    created = 0
     try:
-        for uid in set(u for u in user_ids if u):
-            db.add(Notification(user_id=uid, title=title, body=body))
-            created += 1
-        if created:
+        # one executemany INSERT instead of a unit-of-work flush per ORM object
+        rows = [{"user_id": uid, "title": title, "body": body} for uid in set(u for u in user_ids if u)]
+        if rows:
+            db.execute(insert(Notification), rows)
             db.commit()
-        return created
+        return len(rows)
     finally:
         if close:
             db.close()
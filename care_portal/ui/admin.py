@@ -7,6 +7,7 @@ import string
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, filedialog
 from datetime import datetime, timedelta, date
+from concurrent.futures import ThreadPoolExecutor
 
 from sqlalchemy import select, and_, or_
 from sqlalchemy.orm import joinedload
@@ -68,6 +69,18 @@ def _role_to_text(val) -> str:
         return str(val)
 
 
+# CSV exports write on a worker so the dashboard stays responsive on large tables
+_EXEC = ThreadPoolExecutor(max_workers=2, thread_name_prefix="admin-export")
+
+
+def _write_csv(path: str, header: list[str], rows: list) -> str:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return path
+
+
 def _gen_invite_code(n: int = 8) -> str:
     alphabet = string.ascii_uppercase + string.digits
     return "-".join("".join(secrets.choice(alphabet) for _ in range(4)) for _ in range(max(2, n // 4)))
@@ -229,19 +242,29 @@ class AdminFrame(BaseFrame):
             db.commit()
         messagebox.showinfo("Updated", "Password reset.")
 
-    def export_users_csv(self):
-        if not self.users_tree.get_children():
-            messagebox.showinfo("No data", "No users to export.")
+    def _export_tree_csv(self, tree: ttk.Treeview, header: list[str], what: str):
+        """Snapshot the tree on the Tk thread, write the CSV on _EXEC, report back via after()."""
+        if not tree.get_children():
+            messagebox.showinfo("No data", f"No {what.lower()} to export.")
             return
         path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV", "*.csv")])
         if not path:
             return
-        rows = [self.users_tree.item(i)["values"] for i in self.users_tree.get_children()]
-        with open(path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["id", "name", "email", "role", "phone", "created"])
-            writer.writerows(rows)
-        messagebox.showinfo("Exported", f"Users exported to {path}")
+        rows = [tree.item(i)["values"] for i in tree.get_children()]
+
+        def _done(fut):
+            try:
+                saved = fut.result()
+            except Exception as e:
+                msg = str(e)
+                self.after(0, lambda: messagebox.showerror("Export failed", msg))
+                return
+            self.after(0, lambda: messagebox.showinfo("Exported", f"{what} exported to {saved}"))
+
+        _EXEC.submit(_write_csv, path, header, rows).add_done_callback(_done)
+
+    def export_users_csv(self):
+        self._export_tree_csv(self.users_tree, ["id", "name", "email", "role", "phone", "created"], "Users")
 
     def _open_user_editor(self, uid: int | None = None):
         """Simple modal editor for creating/updating users."""
@@ -506,18 +529,7 @@ class AdminFrame(BaseFrame):
         ttk.Button(btns, text="✖ Cancel", command=win.destroy).pack(side="right", padx=6)
 
     def export_patients_csv(self):
-        if not self.patients_tree.get_children():
-            messagebox.showinfo("No data", "No patients to export.")
-            return
-        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV", "*.csv")])
-        if not path:
-            return
-        rows = [self.patients_tree.item(i)["values"] for i in self.patients_tree.get_children()]
-        with open(path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["id", "name", "dob", "phone", "status", "email"])
-            writer.writerows(rows)
-        messagebox.showinfo("Exported", f"Patients exported to {path}")
+        self._export_tree_csv(self.patients_tree, ["id", "name", "dob", "phone", "status", "email"], "Patients")
 
     # ================= STAFF CHECK-INS =================
     def _build_checkins_tab(self):
@@ -708,18 +720,7 @@ class AdminFrame(BaseFrame):
             )
 
     def export_attendance_csv(self):
-        if not self.att_tree.get_children():
-            messagebox.showinfo("No data", "No attendance to export.")
-            return
-        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV", "*.csv")])
-        if not path:
-            return
-        rows = [self.att_tree.item(i)["values"] for i in self.att_tree.get_children()]
-        with open(path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["day", "checked_in", "active_staff", "daily_rate_%", "mtd_rate_%"])
-            writer.writerows(rows)
-        messagebox.showinfo("Exported", f"Attendance exported to {path}")
+        self._export_tree_csv(self.att_tree, ["day", "checked_in", "active_staff", "daily_rate_%", "mtd_rate_%"], "Attendance")
 
     # ================= TICKETS / SUPPORT =================
     def _build_tickets_tab(self):
@@ -957,15 +958,4 @@ class AdminFrame(BaseFrame):
             messagebox.showinfo("Invite Created", f"Code: {created[0][1]}\nRole: {created[0][0]}\nExpires: {expires:%Y-%m-%d}")
 
     def export_invites_csv(self):
-        if not self.invites_tree.get_children():
-            messagebox.showinfo("No data", "No invites to export.")
-            return
-        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV", "*.csv")])
-        if not path:
-            return
-        rows = [self.invites_tree.item(i)["values"] for i in self.invites_tree.get_children()]
-        with open(path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["id", "code", "created", "expires", "used_by"])
-            writer.writerows(rows)
-        messagebox.showinfo("Exported", f"Invites exported to {path}")
+        self._export_tree_csv(self.invites_tree, ["id", "code", "created", "expires", "used_by"], "Invites")
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import platform
+import re
 import threading
 import tkinter as tk
 from tkinter import ttk
 import tkinter.font as tkfont
+from datetime import datetime
 from pathlib import Path
 from typing import Tuple, Optional, Callable, Any
 
@@ -20,21 +22,50 @@ from .theming import PALETTE, apply_dark_theme, set_density
 
 
 # ---------------- DPI ----------------
+_DPI_APPLIED = False
+
+# DPI_AWARENESS_CONTEXT_PER_MONITOR_AWARE_V2
+_DPI_CONTEXT_PER_MONITOR_V2 = -4
+
+
 def _set_dpi_awareness():
-    """Improve sharpness on HiDPI screens (Windows in particular)."""
+    """Improve sharpness on HiDPI screens (Windows in particular).
+
+    The process DPI mode can only be set once, so later calls are no-ops.
+    """
+    global _DPI_APPLIED
+    if _DPI_APPLIED:
+        return
+    _DPI_APPLIED = True
     try:
         if platform.system() == "Windows":
             try:
                 import ctypes  # type: ignore
                 if hasattr(ctypes, "windll") and hasattr(ctypes.windll, "user32"):
-                    # Per-monitor v2 when available
-                    ctypes.windll.shcore.SetProcessDpiAwareness(2)  # type: ignore[attr-defined]
+                    user32 = ctypes.windll.user32  # type: ignore[attr-defined]
+                    # Per-monitor v2 (Windows 10 1703+), else shcore per-monitor
+                    fn = getattr(user32, "SetProcessDpiAwarenessContext", None)
+                    if fn is None or not fn(ctypes.c_void_p(_DPI_CONTEXT_PER_MONITOR_V2)):
+                        ctypes.windll.shcore.SetProcessDpiAwareness(2)  # type: ignore[attr-defined]
             except Exception:
                 pass
     except Exception:
         pass
 
 
+def _dpi_scale(w: tk.Misc) -> float:
+    """Pixels-per-point for w's toplevel, queried from Tk once and cached."""
+    tl = w.winfo_toplevel()
+    s = getattr(tl, "_dpi_scale", None)
+    if s is None:
+        try:
+            s = max(1.0, float(tl.winfo_fpixels("1i")) / 72.0)
+        except Exception:
+            s = 1.0
+        tl._dpi_scale = s  # type: ignore[attr-defined]
+    return s
+
+
 # ---------------- Window sizing ----------------
 def maximize_root(root: tk.Tk, min_size: Tuple[int, int] = (1100, 750)) -> None:
     """Best-effort maximize with sensible min size & safe fallbacks."""
@@ -66,9 +97,7 @@ def maximize_root(root: tk.Tk, min_size: Tuple[int, int] = (1100, 750)) -> None:
 
     # Apply Tk scaling to keep widgets proportionate on HiDPI
     try:
-        ppi = root.winfo_fpixels("1i")
-        if ppi and ppi > 0:
-            root.tk.call("tk", "scaling", max(1.0, float(ppi) / 72.0))
+        root.tk.call("tk", "scaling", _dpi_scale(root))
     except Exception:
         pass
 
@@ -100,17 +129,47 @@ def _choose_ui_family(root: tk.Misc) -> str:
     return tkfont.nametofont("TkDefaultFont").cget("family")
 
 
+# Tk never frees a Font until the interpreter exits, so share them.
+# Keyed per interpreter: a Font belongs to the Tk root that created it.
+_FONT_CACHE: dict[tuple, tkfont.Font] = {}
+
+
+def _named_font(root: tk.Misc, family: str, size: int, weight: str = "normal") -> tkfont.Font:
+    k = (str(root.tk), family, size, weight)
+    f = _FONT_CACHE.get(k)
+    if f is None:
+        f = tkfont.Font(root=root, family=family, size=size, weight=weight)
+        _FONT_CACHE[k] = f
+    return f
+
+
 # ---------------- Global styling wrapper ----------------
+def _palette_key() -> int:
+    return hash(tuple(sorted(PALETTE.items())))
+
+
 def _apply_global_style(root: tk.Misc):
-    """Apply dark theme, set global fonts, register helper styles, set density."""
+    """Apply dark theme, set global fonts, register helper styles, set density.
+
+    Theme, fonts and styles are registered once per toplevel for a given PALETTE;
+    the density reset still runs for every frame.
+    """
+    top = root.winfo_toplevel()
+    key = _palette_key()
+    if getattr(top, "_style_palette_key", None) != key:
+        _register_global_styles(root)
+        top._style_palette_key = key  # type: ignore[attr-defined]
+
+    # Default density
+    set_density(root, "comfy")
+
+
+def _register_global_styles(root: tk.Misc):
+    """Dark theme, Tk named fonts and the helper ttk styles."""
     apply_dark_theme(root)
 
     ui_family = _choose_ui_family(root)
-    try:
-        scale = max(1.0, root.winfo_fpixels("1i") / 72.0)
-    except Exception:
-        scale = 1.0
-    base = (11 if scale < 1.4 else 12)
+    base = (11 if _dpi_scale(root) < 1.4 else 12)
 
     # Configure Tk named fonts
     try:
@@ -121,65 +180,53 @@ def _apply_global_style(root: tk.Misc):
     except Exception:
         pass
 
-    style = ttk.Style(root)
-    style.configure("Page.TFrame", background=PALETTE.get("frame", "#263140"))
-
-    # Entries
-    style.map(
-        "TEntry",
-        foreground=[("disabled", PALETTE.get("muted", "#A8B3C5"))],
-        fieldbackground=[("!disabled", PALETTE.get("frame", "#263140"))],
-    )
-    style.configure("Placeholder.TEntry",
-                    foreground=PALETTE.get("muted", "#A8B3C5"))
-    style.configure("Valid.TEntry",
-                    fieldbackground=PALETTE.get("frame", "#263140"),
-                    bordercolor=PALETTE.get("success", "#22c55e"))
-    style.configure("Invalid.TEntry",
-                    fieldbackground=PALETTE.get("frame", "#263140"),
-                    bordercolor=PALETTE.get("danger", "#ef4444"))
-
-    # Labels + pills
-    style.configure("Muted.TLabel",
-                    foreground=PALETTE.get("muted", "#A8B3C5"),
-                    background=PALETTE.get("frame", "#263140"))
-    style.configure("Pill.TLabel",
-                    background=PALETTE.get("subtle", "#2B394B"),
-                    foreground=PALETTE.get("fg", "#E8EEF7"),
-                    padding=(10, 4))
-
-    # Buttons (ghost & danger as fallbacks)
-    style.configure("Ghost.TButton",
-                    background=PALETTE.get("frame", "#263140"),
-                    foreground=PALETTE.get("fg", "#E8EEF7"),
-                    borderwidth=0,
-                    padding=(10, 6))
-    style.map("Ghost.TButton",
-              relief=[("pressed", "sunken"), ("!pressed", "flat")])
-
-    style.configure("Danger.TButton",
-                    background=PALETTE.get("danger", "#ef4444"),
-                    foreground=PALETTE.get("accent_fg", "#111827"),
-                    padding=(10, 6))
-    style.map("Danger.TButton",
-              relief=[("pressed", "sunken"), ("!pressed", "raised")])
-
-    # Card styles (for dashboard tiles)
-    style.configure("Card.TFrame",
-                    background=PALETTE.get("subtle", "#2B394B"),
-                    borderwidth=0,
-                    padding=(12, 10))
-    style.configure("MetricNum.TLabel",
-                    background=PALETTE.get("subtle", "#2B394B"),
-                    foreground=PALETTE.get("fg", "#E8EEF7"),
-                    font=(ui_family, base + 6, "bold"))
-    style.configure("MetricCap.TLabel",
-                    background=PALETTE.get("subtle", "#2B394B"),
-                    foreground=PALETTE.get("muted", "#A8B3C5"),
-                    font=(ui_family, base - 1))
+    # Resolve palette once
+    frame = PALETTE.get("frame", "#263140")
+    subtle = PALETTE.get("subtle", "#2B394B")
+    fg = PALETTE.get("fg", "#E8EEF7")
+    muted = PALETTE.get("muted", "#A8B3C5")
+    success = PALETTE.get("success", "#22c55e")
+    danger = PALETTE.get("danger", "#ef4444")
+    accent_fg = PALETTE.get("accent_fg", "#111827")
+
+    theme = {
+        "Page.TFrame": {"configure": {"background": frame}},
+
+        # Entries
+        "TEntry": {"map": {
+            "foreground": [("disabled", muted)],
+            "fieldbackground": [("!disabled", frame)],
+        }},
+        "Placeholder.TEntry": {"configure": {"foreground": muted}},
+        "Valid.TEntry": {"configure": {"fieldbackground": frame, "bordercolor": success}},
+        "Invalid.TEntry": {"configure": {"fieldbackground": frame, "bordercolor": danger}},
+
+        # Labels + pills
+        "Muted.TLabel": {"configure": {"foreground": muted, "background": frame}},
+        "Pill.TLabel": {"configure": {"background": subtle, "foreground": fg, "padding": (10, 4)}},
+
+        # Buttons (ghost & danger as fallbacks)
+        "Ghost.TButton": {
+            "configure": {"background": frame, "foreground": fg, "borderwidth": 0, "padding": (10, 6)},
+            "map": {"relief": [("pressed", "sunken"), ("!pressed", "flat")]},
+        },
+        "Danger.TButton": {
+            "configure": {"background": danger, "foreground": accent_fg, "padding": (10, 6)},
+            "map": {"relief": [("pressed", "sunken"), ("!pressed", "raised")]},
+        },
+
+        # Card styles (for dashboard tiles)
+        "Card.TFrame": {"configure": {"background": subtle, "borderwidth": 0, "padding": (12, 10)}},
+        "MetricNum.TLabel": {"configure": {
+            "background": subtle, "foreground": fg, "font": (ui_family, base + 6, "bold"),
+        }},
+        "MetricCap.TLabel": {"configure": {
+            "background": subtle, "foreground": muted, "font": (ui_family, base - 1),
+        }},
+    }
 
-    # Default density
-    set_density(root, "comfy")
+    style = ttk.Style(root)
+    style.theme_settings(style.theme_use(), theme)
 
 
 # ---------------- Form helpers ----------------
@@ -213,54 +260,90 @@ def mark_valid(widget: ttk.Entry, ok: bool):
 
 
 # ---------------- Table helpers ----------------
+_DT_RE = re.compile(r"\d{4}-\d{2}-\d{2}(?: \d{2}:\d{2})?$")
+
+
 def _try_float_or_dt(s: str) -> tuple[int, Any]:
     """Return a tuple keyed for robust sorting: (type_rank, comparable_value).
     type_rank ensures consistent grouping: numbers < dates < strings.
+    Cheap character probes run first so plain text never pays for a raised ValueError.
     """
     s = str(s).strip()
-    # Try float (numbers with commas allowed)
-    try:
-        val = float(s.replace(",", ""))
-        return (0, val)
-    except Exception:
-        pass
-    # Try datetime (YYYY-MM-DD HH:MM or YYYY-MM-DD)
-    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+    head = s[:1]
+    if head and (head.isdigit() or head in "+-."):
+        # Datetime (YYYY-MM-DD HH:MM or YYYY-MM-DD)
+        if _DT_RE.match(s):
+            try:
+                return (1, datetime.strptime(s, "%Y-%m-%d %H:%M" if len(s) > 10 else "%Y-%m-%d"))
+            except ValueError:
+                pass
+        # Float (numbers with commas allowed)
         try:
-            from datetime import datetime
-            return (1, datetime.strptime(s, fmt))
-        except Exception:
-            continue
+            return (0, float(s.replace(",", "")))
+        except ValueError:
+            pass
     # String fallback (case-insensitive)
     return (2, s.lower())
 
 
+def _column_sort_keys(values: list[str]) -> list[Any]:
+    """Sort keys for one column, specialised to the column's type.
+
+    Whole-column conversions (float / fromisoformat / lower) run in C; only
+    mixed columns fall back to the per-cell _try_float_or_dt probe.
+    """
+    try:
+        return [float(v.replace(",", "")) for v in values]
+    except ValueError:
+        pass
+    try:
+        return list(map(datetime.fromisoformat, values))
+    except ValueError:
+        pass
+    if not any(v[:1].isdigit() or v[:1] in "+-." for v in values if v):
+        return [v.lower() for v in values]
+    return [_try_float_or_dt(v) for v in values]
+
+
 def make_tree_sortable(tree: ttk.Treeview):
     """Make all Treeview columns clickable-sortable with numeric/date smarts."""
     def sort_by(col, reverse=False):
-        rows = [(tree.set(k, col), k) for k in tree.get_children("")]
-        rows.sort(key=lambda x: _try_float_or_dt(x[0]), reverse=reverse)
-        for i, (_, k) in enumerate(rows):
-            tree.move(k, "", i)
+        iids = tree.get_children("")
+        keys = _column_sort_keys([str(tree.set(k, col)).strip() for k in iids])
+        order = sorted(range(len(iids)), key=keys.__getitem__, reverse=reverse)
+        for i, j in enumerate(order):
+            tree.move(iids[j], "", i)
         tree.heading(col, command=lambda: sort_by(col, not reverse))
 
     for col in tree["columns"]:
         tree.heading(col, command=lambda c=col: sort_by(c, False))
 
 
-def autofit_tree_columns(tree: ttk.Treeview, pad=24):
-    """Autosize columns to fit content (cheap pass; call after data insert)."""
+_AUTOFIT_SAMPLE = 64
+_AUTOFIT_MAX_W = 400
+
+
+def autofit_tree_columns(tree: ttk.Treeview, pad=24, max_width: int = _AUTOFIT_MAX_W):
+    """Autosize columns to fit content (cheap pass; call after data insert).
+
+    Only the header plus the first/last rows are measured, and widths are
+    capped so one very long cell cannot blow up the layout.
+    """
     try:
         tree.update_idletasks()
     except Exception:
         pass
-    fnt = tkfont.Font()
+    fnt = tkfont.nametofont("TkDefaultFont")  # existing named font; nothing allocated
+    children = tree.get_children("")
+    if len(children) > _AUTOFIT_SAMPLE:
+        half = _AUTOFIT_SAMPLE // 2
+        children = children[:half] + children[-half:]
     for col in tree["columns"]:
         maxw = fnt.measure(col) + pad
-        for iid in tree.get_children(""):
+        for iid in children:
             txt = tree.set(iid, col)
             maxw = max(maxw, fnt.measure(str(txt)) + pad)
-        tree.column(col, width=maxw)
+        tree.column(col, width=min(maxw, max_width))
 
 
 # ---------------- Toast ----------------
@@ -275,10 +358,13 @@ class Toast(tk.Toplevel):
         lbl = ttk.Label(self, text=text, background=bg, foreground=fg, padding=(12, 8))
         lbl.pack()
         self.after(ms, self.destroy)
-        self.update_idletasks()
+        # Requested size is known without forcing a layout pass
+        w, h = lbl.winfo_reqwidth(), lbl.winfo_reqheight()
+        if w <= 1 or h <= 1:
+            w, h = tkfont.nametofont("TkDefaultFont").measure(text) + 24, 30
         try:
-            x = parent.winfo_rootx() + parent.winfo_width() - self.winfo_width() - 24
-            y = parent.winfo_rooty() + parent.winfo_height() - self.winfo_height() - 24
+            x = parent.winfo_rootx() + parent.winfo_width() - w - 24
+            y = parent.winfo_rooty() + parent.winfo_height() - h - 24
         except Exception:
             x, y = 50, 50
         self.geometry(f"+{x}+{y}")
@@ -420,11 +506,7 @@ def _load_logo_image(root: tk.Misc, max_h: int = 28) -> Optional[tk.PhotoImage]:
         if not logo_path:
             return None
 
-        try:
-            scale = max(1.0, root.winfo_fpixels("1i") / 72.0)
-        except Exception:
-            scale = 1.0
-
+        scale = _dpi_scale(root)
         target_h = int(max_h * (1.2 if scale > 1.4 else 1.0))  # slightly larger on HiDPI
 
         if _HAS_PIL:
@@ -455,6 +537,8 @@ class BaseFrame(ttk.Frame):
       - Floating chat bubble (bottom-right)
     """
     title: str = "Care Portal"
+    # Set True when the page body is a Treeview/Text that scrolls natively
+    use_native_scroll: bool = False
 
     def __init__(self, parent: tk.Misc, controller):
         super().__init__(parent)
@@ -479,7 +563,7 @@ class BaseFrame(ttk.Frame):
             ttk.Label(left, text="🩺", font=("Segoe UI", 16)).pack(side="left", padx=(4, 8))
 
         try:
-            title_font = tkfont.Font(family=_choose_ui_family(self), size=14, weight="bold")
+            title_font = _named_font(self, _choose_ui_family(self), 14, "bold")
         except Exception:
             title_font = None
         self.title_lbl = ttk.Label(left, text=self.title, font=title_font)
@@ -509,10 +593,37 @@ class BaseFrame(ttk.Frame):
 
         ttk.Separator(self, orient="horizontal").pack(fill="x")
 
-        # ----- Scrollable body -----
+        # ----- Page body -----
         container = ttk.Frame(self)
         container.pack(side="top", fill="both", expand=True)
 
+        self._canvas = None
+        self._overflow_cache = None
+        if self.use_native_scroll:
+            # Body widgets (Treeview/Text) scroll themselves; no canvas wrapper
+            self.body = ttk.Frame(container, style="Page.TFrame")
+            self.body.pack(fill="both", expand=True)
+        else:
+            self._build_scroll_body(container)
+
+        # Keyboard shortcuts
+        self.bind_all("<Alt-l>", lambda _e: self._logout())
+        if self._canvas is not None:
+            self.bind_all("<Home>", lambda _e: self._canvas.yview_moveto(0.0))
+            self.bind_all("<End>", lambda _e: self._canvas.yview_moveto(1.0))
+            self.bind_all("<Prior>", lambda _e: self._canvas.yview_scroll(-1, "pages"))  # PageUp
+            self.bind_all("<Next>", lambda _e: self._canvas.yview_scroll(1, "pages"))   # PageDown
+
+        # ----- Initial header state (no user) -----
+        self._show_header_for_logged_out()
+
+        # ----- Floating chat bubble -----
+        self._chat_launcher = None
+        self.after(0, self._ensure_chat_launcher)
+
+    # ---------- scrollable body ----------
+    def _build_scroll_body(self, container: ttk.Frame):
+        """Wrap ``self.body`` in a canvas so arbitrary page content can scroll."""
         self._canvas = tk.Canvas(
             container,
             highlightthickness=0,
@@ -533,16 +644,18 @@ class BaseFrame(ttk.Frame):
         container.grid_columnconfigure(0, weight=1)
 
         # Scroll logic
+        # (need_h, need_v, bbox, view_w, view_h); reset on <Configure> of body/canvas
         def _overflow_state():
-            try:
-                self._canvas.update_idletasks()
-            except Exception:
-                pass
+            cached = self._overflow_cache
+            if cached is not None:
+                return cached
             bbox = self._canvas.bbox(self._window_id) or (0, 0, 0, 0)
             x1, y1, x2, y2 = bbox
             view_w = self._canvas.winfo_width()
             view_h = self._canvas.winfo_height()
-            return (x2 - x1) > view_w + 1, (y2 - y1) > view_h + 1, bbox, view_w, view_h
+            state = ((x2 - x1) > view_w + 1, (y2 - y1) > view_h + 1, bbox, view_w, view_h)
+            self._overflow_cache = state
+            return state
 
         def _clamp_scrollregion():
             need_h, need_v, bbox, view_w, view_h = _overflow_state()
@@ -563,9 +676,14 @@ class BaseFrame(ttk.Frame):
             else:
                 self._vbar.grid_remove()
 
-        self.body.bind("<Configure>", lambda _e=None: _update_scrollbars())
+        def _on_body_configure(_e=None):
+            self._overflow_cache = None
+            _update_scrollbars()
+
+        self.body.bind("<Configure>", _on_body_configure)
 
         def _on_canvas_resize(event):
+            self._overflow_cache = None
             try:
                 self._canvas.itemconfigure(self._window_id, width=event.width)
             except Exception:
@@ -594,21 +712,7 @@ class BaseFrame(ttk.Frame):
         for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
             self._canvas.bind(seq, _wheel, add="+")
 
-        self.after(0, _update_scrollbars)
-
-        # Keyboard shortcuts
-        self.bind_all("<Alt-l>", lambda _e: self._logout())
-        self.bind_all("<Home>", lambda _e: self._canvas.yview_moveto(0.0))
-        self.bind_all("<End>", lambda _e: self._canvas.yview_moveto(1.0))
-        self.bind_all("<Prior>", lambda _e: self._canvas.yview_scroll(-1, "pages"))  # PageUp
-        self.bind_all("<Next>", lambda _e: self._canvas.yview_scroll(1, "pages"))   # PageDown
-
-        # ----- Initial header state (no user) -----
-        self._show_header_for_logged_out()
-
-        # ----- Floating chat bubble -----
-        self._chat_launcher = None
-        self.after(0, self._ensure_chat_launcher)
+        self.after(0, _on_body_configure)
 
     # ---------- header show/hide ----------
     def _show_header_for_logged_out(self):
@@ -707,8 +811,10 @@ class BaseFrame(ttk.Frame):
         return wrap
 
     def clear_treeview(self, tree: ttk.Treeview):
-        for iid in tree.get_children():
-            tree.delete(iid)
+        children = tree.get_children()
+        if children:
+            tree.delete(*children)  # one Tcl call for all rows
+        self._overflow_cache = None
 
     def enhance_treeview(self, tree: ttk.Treeview, zebra: bool = True):
         self.style_treeview(tree, zebra=zebra)
@@ -1,10 +1,24 @@
 # care_portal/ui/doctor.py
+"""
+Doctor Portal.
+
+Set CARE_PORTAL_DEBUG_ORM=1 during development to append raiseload("*") to the
+dashboard queries: any relationship not declared via selectinload then raises
+instead of silently lazy-loading (an N+1 stall on the Tk thread).
+"""
 from __future__ import annotations
 
+import functools
+import itertools
+import os
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime, timedelta, date
 from typing import Optional
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
 
 # Optional date picker
 try:
@@ -15,8 +29,8 @@ except Exception:
     DateEntry = None  # type: ignore
     Calendar = None   # type: ignore
 
-from sqlalchemy import select, func, delete
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, lambda_stmt, union_all, func, delete, insert, update, exists, literal, event, inspect, or_
+from sqlalchemy.orm import Session, joinedload, selectinload, raiseload
 
 from ..db import SessionLocal
 from ..models import (
@@ -44,34 +58,356 @@ from ..models import (
 )
 from ..services.appointments import AppointmentService
 from .base import BaseFrame
-from ..services.checkin import today_checkins
+from .utils import run_in_thread, fill_tree, sync_tree, TreeSync
+from ..services.checkin import today_checkin_rows
 
 
 # ------------------------------ Formats ------------------------------
-DATE_FMT = "%Y-%m-%d %H:%M"
+DATE_FMT = "%Y-%m-%d %H:%M"  # table cells render this via _fmt_dt
 DAY_FMT  = "%Y-%m-%d"
 TIME_FMT = "%H:%M"
 
+# One bound formatter for DATE_FMT-style table cells (isoformat's C path, no strftime)
+_fmt_dt = functools.partial(datetime.isoformat, sep=" ", timespec="minutes")
+
+# Status filter combobox value -> enum
+_STATUS_MAP = {s.value: s for s in AppointmentStatus}
+
+# Prescription text layout shared by the quick-action and patient-dialog Rx forms
+_RX_FIELDS = ("Medication", "Dose", "Frequency", "Duration", "Notes")
+
+
+def _format_rx(*vals: str) -> str:
+    """'Medication: …; Dose: …; …' in _RX_FIELDS order."""
+    return "; ".join(f"{k}: {v}" for k, v in zip(_RX_FIELDS, vals))
+
+# Disciplinary combobox choices/defaults (patient dialog)
+_DISC_SEV_VALUES = tuple(s.value for s in DisciplinarySeverity)
+_DISC_STATUS_VALUES = tuple(s.value for s in DisciplinaryStatus)
+_DISC_LOW = DisciplinarySeverity.low.value
+_DISC_OPEN = DisciplinaryStatus.open.value
+
+
+# ------------------------------ Loader options ------------------------------
+# Appointment lists render the patient's name; load patient + user in one IN-query each.
+_APPT_PATIENT_USER = selectinload(Appointment.patient).selectinload(Patient.user)
+# Single-appointment views (snapshot, patient dialog): patient + user joined into the same SELECT.
+_APPT_PATIENT_USER_JOINED = joinedload(Appointment.patient).joinedload(Patient.user)
+
+
+def _read_session(db=None):
+    """`with _read_session(db) as s:` reuses the caller's session, else opens a new one."""
+    return nullcontext(db) if db is not None else SessionLocal()
+
+
+def _loader_opts(*eager):
+    """Eager options, plus raiseload("*") when CARE_PORTAL_DEBUG_ORM is set."""
+    return [*eager, raiseload("*")] if os.getenv("CARE_PORTAL_DEBUG_ORM") else list(eager)
+
+
+# ------------------------------ Today's next-patient cache ------------------------------
+# (doctor_id, "YYYY-MM-DD") -> (monotonic ts, (scheduled_for, patient_label) of the next patient or None)
+_APPT_CACHE_TTL = 30.0
+_APPT_CACHE: dict[tuple[int, str], tuple[float, tuple | None]] = {}
+# (doctor_id, date) -> (monotonic ts, free "HH:MM" slots); feeds the assign/reschedule pickers
+_SLOT_CACHE_TTL = 60.0
+_SLOT_CACHE: dict[tuple[int, date], tuple[float, list[str]]] = {}
+# KPI workers fill _APPT_CACHE while the Tk thread and the after_flush hook prune it:
+# every read/write of either cache goes through this lock
+_CACHE_LOCK = threading.Lock()
+
+
+def _invalidate_appt_cache(session, _flush_context):
+    """after_flush hook: drop cached days for any doctor whose appointments changed."""
+    doctor_ids: set[int] = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Appointment):
+            doctor_ids.add(obj.doctor_id)
+            doctor_ids.update(inspect(obj).attrs.doctor_id.history.deleted or ())
+    if doctor_ids:
+        _drop_appt_cache(*doctor_ids)
+
+
+def _drop_appt_cache(*doctor_ids: int) -> None:
+    """Forget cached days and free slots for these doctors (Core writes bypass the flush hook)."""
+    with _CACHE_LOCK:
+        for key in [k for k in _APPT_CACHE if k[0] in doctor_ids]:
+            del _APPT_CACHE[key]
+        for key in [k for k in _SLOT_CACHE if k[0] in doctor_ids]:
+            del _SLOT_CACHE[key]
+
+
+def _drop_slot_cache(doctor_id: int, day: date) -> None:
+    """Forget one doctor/day of free slots (a save found the cached list stale)."""
+    with _CACHE_LOCK:
+        _SLOT_CACHE.pop((doctor_id, day), None)
+
+
+event.listen(Session, "after_flush", _invalidate_appt_cache)
+
+
+def _free_slots(doctor_id: int, day: datetime) -> list[str]:
+    """AppointmentService.get_available_slots, reused for _SLOT_CACHE_TTL seconds per doctor/day.
+
+    Booking writes drop the doctor's entries (see _drop_appt_cache); the assign/
+    reschedule dialogs still re-check the slot with _slot_taken before saving.
+    """
+    key = (doctor_id, day.date())
+    now = time.monotonic()
+    with _CACHE_LOCK:
+        hit = _SLOT_CACHE.get(key)
+    if hit and now - hit[0] <= _SLOT_CACHE_TTL:
+        return list(hit[1])
+    slots = AppointmentService.get_available_slots(doctor_id, day)
+    with _CACHE_LOCK:
+        _SLOT_CACHE[key] = (now, slots)
+    return list(slots)
+
+
+def _next_appt_today(db, doctor_id: int, day0: datetime, day1: datetime) -> tuple | None:
+    """(scheduled_for, patient_label) of the day's first non-cancelled appointment, or None.
+
+    One ORDER BY ... LIMIT 1 probe instead of loading the whole day; cached per
+    doctor/day like the rest of the KPI inputs.
+    """
+    key = (doctor_id, day0.date().isoformat())
+    now = time.monotonic()
+    with _CACHE_LOCK:
+        hit = _APPT_CACHE.get(key)
+    if hit and now - hit[0] <= _APPT_CACHE_TTL:
+        return hit[1]
+
+    row = db.execute(
+        select(Appointment.scheduled_for, User.full_name, User.email)
+        .outerjoin(Patient, Patient.id == Appointment.patient_id)
+        .outerjoin(User, User.id == Patient.user_id)
+        .where(
+            Appointment.doctor_id == doctor_id,
+            Appointment.scheduled_for >= day0,
+            Appointment.scheduled_for < day1,
+            Appointment.status != AppointmentStatus.cancelled,
+        )
+        .order_by(Appointment.scheduled_for.asc())
+        .limit(1)
+    ).first()
+    nxt = (row.scheduled_for, row.full_name or row.email or "") if row else None
+    with _CACHE_LOCK:
+        _APPT_CACHE[key] = (now, nxt)
+    return nxt
+
+
+def _kpi_counts(db, doctor_id: int, day0: datetime, day1: datetime):
+    """All KPI tile counts for one doctor in a single conditional-aggregate round-trip.
+
+    The day's latest availability rule (av_start/av_end/av_slot, NULL when none)
+    rides along as scalar subqueries, so utilisation needs no second query.
+    """
+    ap_id = func.distinct(Appointment.id)
+
+    def _av(col):
+        return (
+            select(col)
+            .where(
+                DoctorAvailability.doctor_id == doctor_id,
+                DoctorAvailability.day >= day0,
+                DoctorAvailability.day < day1,
+            )
+            .order_by(DoctorAvailability.id.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+
+    return db.execute(
+        select(
+            func.count(ap_id).label("today"),
+            func.count(ap_id).filter(Appointment.status == AppointmentStatus.completed).label("completed"),
+            func.count(ap_id).filter(Appointment.status == AppointmentStatus.cancelled).label("cancelled"),
+            func.count(func.distinct(Attendance.appointment_id)).label("checked_in"),
+            _av(DoctorAvailability.start_time).label("av_start"),
+            _av(DoctorAvailability.end_time).label("av_end"),
+            _av(DoctorAvailability.slot_minutes).label("av_slot"),
+        )
+        .select_from(Appointment)
+        .outerjoin(Attendance, Attendance.appointment_id == Appointment.id)
+        .where(
+            Appointment.doctor_id == doctor_id,
+            Appointment.scheduled_for >= day0,
+            Appointment.scheduled_for < day1,
+        )
+    ).one()
+
+
+def _replace_availability(db, doctor_id: int, day: datetime, slots) -> int:
+    """Swap a doctor's rules for one day: one bulk DELETE, one executemany INSERT.
+
+    `slots` is an iterable of (start_hhmm, end_hhmm, slot_minutes). Returns the
+    number of rows removed; the caller commits.
+    """
+    day0, day1 = _day_range(day)
+    removed = db.execute(
+        delete(DoctorAvailability).where(
+            DoctorAvailability.doctor_id == doctor_id,
+            DoctorAvailability.day >= day0,
+            DoctorAvailability.day < day1,
+        )
+    ).rowcount
+    rows = [
+        {"doctor_id": doctor_id, "day": day0, "start_time": st, "end_time": et, "slot_minutes": mins}
+        for st, et, mins in slots
+    ]
+    if rows:
+        db.execute(insert(DoctorAvailability), rows)
+    return removed or 0
+
+
+def _slot_taken(db, doctor_id: int, when: datetime, exclude_id: int) -> bool:
+    """True if another live (non-cancelled) appointment holds this doctor's slot.
+
+    Probes with SELECT 1 ... LIMIT 1 so the (doctor_id, scheduled_for) index
+    answers it without materialising a row.
+    """
+    return db.scalar(
+        select(literal(1))
+        .select_from(Appointment)
+        .where(
+            Appointment.doctor_id == doctor_id,
+            Appointment.scheduled_for == when,
+            Appointment.id != exclude_id,
+            Appointment.status != AppointmentStatus.cancelled,
+        )
+        .limit(1)
+    ) is not None
+
 
 # ------------------------------ Small helpers ------------------------------
 def _parse_hhmm(s: str) -> tuple[int, int] | None:
     """Return (hour, minute) if s is HH:MM, else None."""
-    try:
-        t = datetime.strptime(s.strip(), TIME_FMT)
-        return t.hour, t.minute
-    except Exception:
+    h, sep, m = s.strip().partition(":")
+    # same leniency as strptime("%H:%M"): 1–2 digit fields, ASCII digits only
+    if not sep or not (0 < len(h) <= 2 and 0 < len(m) <= 2):
         return None
+    if not (h.isascii() and m.isascii() and h.isdigit() and m.isdigit()):
+        return None
+    hi, mi = int(h), int(m)
+    return (hi, mi) if hi < 24 and mi < 60 else None
+
+
+@functools.lru_cache(maxsize=256)
+def _slot_count(start_h: int, start_m: int, end_h: int, end_m: int, slot_min: int) -> int:
+    """Number of slot start times in [start, end) — the same grid the booking service offers.
+
+    Pure in its arguments, so every KPI refresh on the same rule reuses the result.
+    """
+    span = (end_h * 60 + end_m) - (start_h * 60 + start_m)
+    if span <= 0 or slot_min <= 0:
+        return 0
+    return -(-span // slot_min)  # ceil: a last slot may start before `end` and run past it
+
+
+@functools.lru_cache(maxsize=8)
+def _day_bounds(day_iso: str) -> tuple[datetime, datetime]:
+    """[00:00, next 00:00) for a YYYY-MM-DD day; cached, so panels refreshing together share it."""
+    d0 = datetime.fromisoformat(day_iso)
+    return d0, d0 + timedelta(days=1)
 
 
 def _day_range(dt: datetime) -> tuple[datetime, datetime]:
     """UTC day range [00:00, 24:00) for index-friendly queries."""
-    d0 = dt.replace(hour=0, minute=0, second=0, microsecond=0)
-    d1 = d0 + timedelta(days=1)
-    return d0, d1
+    return _day_bounds(dt.date().isoformat())
+
+
+# ------------------------------ Treeview streaming ------------------------------
+_FEEDS: dict[str, object] = {}
+
+
+def _feed_tree(tree: ttk.Treeview, rows, batch: int = 200, on_done=None) -> None:
+    """Sync `rows` (value tuples, DB id first) into `tree`, `batch` at a time, one batch per idle tick.
+
+    The first rows show up while the rest are still being fetched, rows already on
+    screen are only touched if they changed (see TreeSync); starting a new feed
+    for the same tree abandons the one in progress.
+    """
+    key = str(tree)
+    old = _FEEDS.pop(key, None)
+    if old is not None and hasattr(old, "close"):
+        old.close()
+    it = iter(rows)
+    _FEEDS[key] = it
+    sync = TreeSync(tree)
+
+    def _step():
+        if _FEEDS.get(key) is not it:
+            return
+        n = 0
+        try:
+            for values in itertools.islice(it, batch):
+                sync.add(values)
+                n += 1
+        except tk.TclError:  # tree destroyed mid-feed
+            n = 0
+        except Exception as e:
+            print("Treeview feed error:", e)
+            n = 0
+        if n == batch:
+            tree.after_idle(_step)
+            return
+        _FEEDS.pop(key, None)
+        if hasattr(it, "close"):
+            it.close()
+        try:
+            sync.finish()
+            if on_done:
+                on_done()
+        except tk.TclError:
+            pass
+
+    _step()
+
+
+# One hidden Toplevel + Calendar per session; pick_date shows/hides it instead of rebuilding.
+_PICKER: dict[str, object] = {"top": None, "cal": None, "ok": None, "cancel": None}
+
+
+def _date_picker(parent):
+    """Return the cached (top, cal, ok, cancel), building it on first use or after the root was rebuilt."""
+    top = _PICKER["top"]
+    try:
+        alive = top is not None and bool(top.winfo_exists())
+    except Exception:
+        alive = False
+    if alive:
+        return _PICKER["top"], _PICKER["cal"], _PICKER["ok"], _PICKER["cancel"]
+
+    # parent to the root so closing whichever dialog opened it doesn't take the picker down
+    top = tk.Toplevel(parent._root())
+    top.withdraw()
+    top.title("Select date")
+
+    frm = ttk.Frame(top, padding=10)
+    frm.pack(fill="both", expand=True)
+
+    cal = Calendar(frm, selectmode="day", date_pattern="yyyy-mm-dd")
+    cal.pack(fill="both", expand=True)
+
+    btns = ttk.Frame(frm)
+    btns.pack(fill="x", pady=(8, 0))
+    cancel = ttk.Button(btns, text="Cancel")
+    cancel.pack(side="right", padx=(6, 0))
+    ok = ttk.Button(btns, text="OK")
+    ok.pack(side="right")
+
+    _PICKER.update(top=top, cal=cal, ok=ok, cancel=cancel)
+    return top, cal, ok, cancel
 
 
 def pick_date(parent, initial: date | None = None) -> date | None:
-    """Topmost, modal calendar/date prompt (won’t hide behind the app)."""
+    """Topmost, modal calendar/date prompt (won’t hide behind the app).
+
+    With CARE_PORTAL_HEADLESS set (scripted/CI runs) no widgets are created and
+    `initial` (or today) is returned straight away.
+    """
+    if os.getenv("CARE_PORTAL_HEADLESS"):
+        return initial or datetime.now().date()
     if not HAS_TKCAL or Calendar is None:
         from tkinter import simpledialog
         s = simpledialog.askstring("Pick date", "YYYY-MM-DD", parent=parent)
@@ -83,12 +419,23 @@ def pick_date(parent, initial: date | None = None) -> date | None:
             messagebox.showerror("Invalid", "Use YYYY-MM-DD")
             return None
 
-    top = tk.Toplevel(parent)
-    top.title("Select date")
+    top, cal, ok, cancel = _date_picker(parent)
+    # fresh result var per open: a stale value from an aborted wait can't leak through
+    var = tk.IntVar(top, 0)  # 1 = OK, -1 = cancelled
+    ok.configure(command=lambda: var.set(1))
+    cancel.configure(command=lambda: var.set(-1))
+    top.protocol("WM_DELETE_WINDOW", lambda: var.set(-1))
+    init = initial or datetime.now().date()
+    try:
+        cal.selection_set(init)
+        cal.see(init)
+    except Exception:
+        pass
     try:
         top.transient(parent.winfo_toplevel())
     except Exception:
         pass
+    top.deiconify()
     try:
         top.lift()
         top.attributes("-topmost", True)
@@ -97,38 +444,19 @@ def pick_date(parent, initial: date | None = None) -> date | None:
     except Exception:
         pass
 
-    frm = ttk.Frame(top, padding=10)
-    frm.pack(fill="both", expand=True)
-
-    init = initial or datetime.now().date()
-    cal = Calendar(
-        frm,
-        selectmode="day",
-        year=init.year, month=init.month, day=init.day,
-        date_pattern="yyyy-mm-dd"
-    )
-    cal.pack(fill="both", expand=True)
-
-    chosen: dict[str, Optional[date]] = {"d": None}
-
-    def _ok():
-        try:
-            chosen["d"] = datetime.strptime(cal.get_date(), "%Y-%m-%d").date()
-        except Exception:
-            chosen["d"] = None
-        top.destroy()
-
-    def _cancel():
-        chosen["d"] = None
-        top.destroy()
-
-    btns = ttk.Frame(frm)
-    btns.pack(fill="x", pady=(8, 0))
-    ttk.Button(btns, text="Cancel", command=_cancel).pack(side="right", padx=(6, 0))
-    ttk.Button(btns, text="OK", command=_ok).pack(side="right")
-
-    top.wait_window()
-    return chosen["d"]
+    top.wait_variable(var)
+    try:
+        picked = var.get() == 1
+        top.grab_release()
+        top.withdraw()
+    except Exception:  # app closed while the picker was open
+        return None
+    if not picked:
+        return None
+    try:
+        return cal.selection_get()  # already a date; no str round-trip
+    except Exception:
+        return None
 
 
 # =============================================================================
@@ -140,7 +468,16 @@ class DoctorFrame(BaseFrame):
 
         # resolve doctor row for logged-in user
         self.doctor: Doctor | None = None
+        self._doctor_cache_for_user_id: int | None = None  # user the cached self.doctor belongs to
         self._load_doctor()
+        self._search_after_id: str | None = None  # pending debounced schedule refresh
+        self._snap_after_id: str | None = None    # pending debounced snapshot reload
+        self._snap_seq = 0  # bumped per snapshot load; older worker results are dropped
+        self._io = ThreadPoolExecutor(max_workers=2, thread_name_prefix="doctor-db")
+        self._sched_seq = 0  # bumps per schedule refresh; stale worker results are dropped
+        self._ap_rows: dict[int, tuple] = {}  # appt id -> row values currently in tree_ap
+        self._ap_apply = None  # in-progress chunked apply (generator), if any
+        self._show_checkins = True  # False hides the Checked-in column and drops its EXISTS probe
 
         # ----- Top-level layout: left Filters sidebar + right Notebook -----
         root = ttk.Frame(self.body, padding=8)
@@ -175,11 +512,13 @@ class DoctorFrame(BaseFrame):
         )
         self.f_status.current(0)
         self.f_status.grid(row=5, column=0, columnspan=2, sticky="ew", pady=(2, 4))
+        self.f_status.bind("<<ComboboxSelected>>", self._debounced_refresh)
 
         # Search
         ttk.Label(self.sidebar, text="Search (patient/reason)").grid(row=6, column=0, columnspan=2, sticky="w")
         self.f_search = ttk.Entry(self.sidebar, width=18)
         self.f_search.grid(row=7, column=0, columnspan=2, sticky="ew", pady=(2, 6))
+        self.f_search.bind("<KeyRelease>", self._debounced_refresh)  # live filter, one query per typing burst
 
         ttk.Button(self.sidebar, text="Refresh", command=self._refresh_schedule)\
             .grid(row=8, column=0, columnspan=2, sticky="ew", pady=(6, 2))
@@ -205,28 +544,24 @@ class DoctorFrame(BaseFrame):
         self.nb.add(self.tab_support, text="Support")
         self.nb.add(self.tab_kpi, text="Today")
 
-        # build tabs (creates self.tree_ap)
+        # build the Appointments tab now (creates self.tree_ap); the others are
+        # built + loaded the first time they are shown (see _on_tab_changed)
         self._build_schedule_tab()
-        self._build_availability_tab()
-        self._build_requests_tab()
-        self._build_notifications_tab()
-        self._build_support_tab()
-        self._build_kpi_tab()
+        self._tab_built: set[str] = set()
+        self._tab_builders = {
+            str(self.tab_avail):    (self._build_availability_tab, self._refresh_availability),
+            str(self.tab_requests): (self._build_requests_tab, self._refresh_requests),
+            str(self.tab_notif):    (self._build_notifications_tab, self._refresh_notifications),
+            str(self.tab_support):  (self._build_support_tab, self._refresh_support),
+            str(self.tab_kpi):      (self._build_kpi_tab, self._refresh_kpi_tab),
+        }
+        self.nb.bind("<<NotebookTabChanged>>", self._on_tab_changed)
 
         # Apply initial mode (now safe because tree_ap exists)
         self._on_filter_mode_change()
 
-        # initial loads
-        self._refresh_schedule()
-        self._refresh_availability()
-        self._refresh_requests()
-        self._refresh_notifications()
-        self._refresh_support()
-        self._refresh_kpis()
-        try:
-            self.refresh_checkins()
-        except Exception:
-            pass
+        # initial loads (unread badge only; the Notifications list loads when opened)
+        self._refresh_all()
     def _on_filter_mode_change(self):
         mode = (self.f_mode.get() or "All").strip()
         is_by_date = (mode == "By Date")
@@ -238,7 +573,51 @@ class DoctorFrame(BaseFrame):
             pass
         # Only refresh if the table exists (safe on startup)
         if hasattr(self, "tree_ap"):
-            self._refresh_schedule()
+            self._debounced_refresh()
+
+    def _debounced_refresh(self, _e=None, delay: int = 250):
+        """Coalesce a burst of filter edits into a single schedule refresh."""
+        if self._search_after_id:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(delay, self._refresh_schedule)
+
+    def _on_appt_select(self, _e=None, delay: int = 80):
+        """Arrow-keying through the schedule: reload the snapshot once the selection settles."""
+        # quick actions act on the selection at once, not on the debounced snapshot
+        self._current_appt_id = self._selected_appt_id()
+        self._current_patient_id = None
+        if self._snap_after_id:
+            self.after_cancel(self._snap_after_id)
+        self._snap_after_id = self.after(delay, self._load_snapshot_from_selection)
+
+    def _on_tab_changed(self, _e=None):
+        key = self.nb.select()
+        if key in self._tab_built or key not in self._tab_builders:
+            return
+        build, refresh = self._tab_builders[key]
+        self._tab_built.add(key)
+        build()
+        refresh()
+
+    def _tab_ready(self, tab) -> bool:
+        """True once a lazily built tab exists; refreshes of unbuilt tabs are skipped."""
+        return str(tab) in self._tab_built
+
+    def _refresh_kpi_tab(self):
+        """KPI summary + today's staff check-ins: one worker job on one session."""
+        if not self._tab_ready(self.tab_kpi):
+            return
+        if not self.doctor:
+            self.refresh_checkins()
+            return
+        doctor_id = self.doctor.id
+        who = self.controller.current_user.full_name or self.controller.current_user.email
+        run_in_thread(
+            work=lambda: self._fetch_kpis_and_checkins(doctor_id, who),
+            on_done=self._show_kpis_and_checkins,
+            on_error=lambda e: print("DoctorFrame KPI refresh error:", e),
+            tk_after=self.after,
+        )
 
     # ====================================================
     # Lifecycle
@@ -256,25 +635,33 @@ class DoctorFrame(BaseFrame):
                 pass
             return
         try:
-            self._refresh_schedule()
-            self._refresh_availability()
-            self._refresh_requests()
-            self._refresh_notifications()
-            self._refresh_support()
-            self._refresh_kpis()
-            self.refresh_checkins()
+            self._refresh_all()
         except Exception as e:
             print("DoctorFrame on_show refresh error:", e)
 
-    def _load_doctor(self):
+    def _refresh_all(self):
+        """Refresh every built tab through one shared session (one checkout/transaction)."""
+        self._refresh_schedule()  # heaviest query: worker thread, own session
+        with SessionLocal() as db:
+            self._refresh_availability(db)
+            self._refresh_requests(db)
+            self._refresh_notifications(db)
+            self._refresh_support(db)
+        # KPIs + check-ins load together on a worker thread with their own session
+        self._refresh_kpi_tab()
+
+    def _load_doctor(self, db: Session | None = None):
         user = getattr(self.controller, "current_user", None)
         if not user:
             self.doctor = None
+            self._doctor_cache_for_user_id = None
             return
+        if self.doctor is not None and user.id == self._doctor_cache_for_user_id:
+            return  # same user as last time; Doctor row is still current
 
         role_val = getattr(getattr(user, "role", None), "value", getattr(user, "role", None))
 
-        with SessionLocal() as db:
+        with (nullcontext(db) if db is not None else SessionLocal()) as db:
             doc = db.scalar(select(Doctor).where(Doctor.user_id == user.id))
             # Auto-provision if logged-in user is a doctor but profile missing
             if not doc and role_val == "doctor":
@@ -284,9 +671,14 @@ class DoctorFrame(BaseFrame):
                 db.refresh(doc)
             self.doctor = doc
 
+        self._doctor_cache_for_user_id = user.id if self.doctor else None
         if not self.doctor and role_val == "doctor":
             print("Warning: user has role=doctor but Doctor profile could not be created.")
 
+    def on_logout(self):
+        self.doctor = None
+        self._doctor_cache_for_user_id = None
+
     # ---------------- Profile dialog (unchanged logic; minor UX polish) ------------------
     def _open_profile_dialog(self):
         """
@@ -322,73 +714,33 @@ class DoctorFrame(BaseFrame):
         frm = ttk.Frame(top, padding=12)
         frm.pack(fill="both", expand=True)
 
-        r = 0
-        # --- User fields ---
-        ttk.Label(frm, text="Full Name").grid(row=r, column=0, sticky="w")
-        full_in = ttk.Entry(frm, width=40)
-        full_in.insert(0, u.full_name or "")
-        full_in.grid(row=r, column=1, sticky="ew"); r += 1
-
-        ttk.Label(frm, text="Email (login)").grid(row=r, column=0, sticky="w")
-        email_in = ttk.Entry(frm, width=40)
-        email_in.insert(0, u.email or "")
-        email_in.grid(row=r, column=1, sticky="ew"); r += 1
-
-        ttk.Label(frm, text="Phone").grid(row=r, column=0, sticky="w")
-        phone_in = ttk.Entry(frm, width=40)
-        phone_in.insert(0, u.phone or "")
-        phone_in.grid(row=r, column=1, sticky="ew"); r += 1
-
-        ttk.Separator(frm, orient="horizontal").grid(row=r, column=0, columnspan=2, sticky="ew", pady=(8, 8)); r += 1
-
-        # --- Doctor fields ---
-        ttk.Label(frm, text="Specialty").grid(row=r, column=0, sticky="w")
-        spec_in = ttk.Entry(frm, width=40)
-        spec_in.insert(0, d.specialty or "General")
-        spec_in.grid(row=r, column=1, sticky="ew"); r += 1
-
-        ttk.Label(frm, text="License No").grid(row=r, column=0, sticky="w")
-        lic_in = ttk.Entry(frm, width=40)
-        lic_in.insert(0, getattr(d, "license_no", "") or "")
-        lic_in.grid(row=r, column=1, sticky="ew"); r += 1
-
-        ttk.Label(frm, text="Designation / Title").grid(row=r, column=0, sticky="w")
-        title_in = ttk.Entry(frm, width=40)
-        title_in.insert(0, getattr(d, "designation", "") or "")
-        title_in.grid(row=r, column=1, sticky="ew"); r += 1
-
-        ttk.Label(frm, text="Years Experience").grid(row=r, column=0, sticky="w")
-        years_in = ttk.Entry(frm, width=12)
-        try:
-            years_in.insert(0, str(int(getattr(d, "years_exp", 0) or 0)))
-        except Exception:
-            years_in.insert(0, "0")
-        years_in.grid(row=r, column=1, sticky="w"); r += 1
-
-        ttk.Label(frm, text="Employee ID").grid(row=r, column=0, sticky="w")
-        empid_in = ttk.Entry(frm, width=40)
-        empid_in.insert(0, getattr(d, "employee_id", "") or "")
-        empid_in.grid(row=r, column=1, sticky="ew"); r += 1
-
-        ttk.Label(frm, text="Degree").grid(row=r, column=0, sticky="w")
-        degree_in = ttk.Entry(frm, width=40)
-        degree_in.insert(0, getattr(d, "degree", "") or "")
-        degree_in.grid(row=r, column=1, sticky="ew"); r += 1
-
-        ttk.Label(frm, text="University").grid(row=r, column=0, sticky="w")
-        univ_in = ttk.Entry(frm, width=40)
-        univ_in.insert(0, getattr(d, "university", "") or "")
-        univ_in.grid(row=r, column=1, sticky="ew"); r += 1
-
-        ttk.Label(frm, text="Certifications").grid(row=r, column=0, sticky="w")
-        cert_in = ttk.Entry(frm, width=40)
-        cert_in.insert(0, getattr(d, "certifications", "") or "")
-        cert_in.grid(row=r, column=1, sticky="ew"); r += 1
-
-        ttk.Label(frm, text="Work Address").grid(row=r, column=0, sticky="w")
-        addr_in = ttk.Entry(frm, width=40)
-        addr_in.insert(0, getattr(d, "work_address", "") or "")
-        addr_in.grid(row=r, column=1, sticky="ew"); r += 1
+        # (label, initial value, entry width); None draws the User/Doctor separator
+        fields = [
+            ("Full Name", u.full_name, 40),
+            ("Email (login)", u.email, 40),
+            ("Phone", u.phone, 40),
+            None,
+            ("Specialty", d.specialty or "General", 40),
+            ("License No", d.license_no, 40),
+            ("Designation / Title", d.designation, 40),
+            ("Years Experience", str(d.years_exp or 0), 12),
+            ("Employee ID", d.employee_id, 40),
+            ("Degree", d.degree, 40),
+            ("University", d.university, 40),
+            ("Certifications", d.certifications, 40),
+            ("Work Address", d.work_address, 40),
+        ]
+        entries: dict[str, ttk.Entry] = {}
+        for r, field in enumerate(fields):
+            if field is None:
+                ttk.Separator(frm, orient="horizontal").grid(row=r, column=0, columnspan=2, sticky="ew", pady=(8, 8))
+                continue
+            label, val, w = field
+            ttk.Label(frm, text=label).grid(row=r, column=0, sticky="w")
+            e = ttk.Entry(frm, width=w)
+            e.insert(0, val or "")
+            e.grid(row=r, column=1, sticky="ew" if w >= 40 else "w")
+            entries[label] = e
 
         frm.columnconfigure(1, weight=1)
 
@@ -397,8 +749,10 @@ class DoctorFrame(BaseFrame):
         ttk.Button(btns, text="Cancel", command=top.destroy).pack(side="right", padx=(6, 0))
 
         def save():
+            vals = {label: e.get().strip() for label, e in entries.items()}
+
             # Validate Years Experience
-            years_txt = years_in.get().strip()
+            years_txt = vals["Years Experience"]
             try:
                 years_val = int(years_txt) if years_txt else 0
                 if years_val < 0:
@@ -407,47 +761,47 @@ class DoctorFrame(BaseFrame):
                 messagebox.showerror("Invalid", "Years Experience must be a non-negative integer.")
                 return
 
+            # one session for the whole save; the rows were validated when the dialog
+            # opened, so write both with a single Core UPDATE each (no reload, no
+            # attribute history), then re-read the doctor on the same connection
             with SessionLocal() as db:
-                d2 = db.get(Doctor, d.id)
-                u2 = db.get(User, u.id)
-                if not d2 or not u2:
-                    messagebox.showerror("Error", "Profile not found.")
-                    return
-
-                # Update user
-                u2.full_name = full_in.get().strip()
-                u2.email     = email_in.get().strip()
-                u2.phone     = phone_in.get().strip()
-
-                # Update doctor
-                d2.specialty     = spec_in.get().strip() or "General"
-                d2.license_no    = lic_in.get().strip()
-                d2.designation   = title_in.get().strip()
-                d2.years_exp     = years_val
-                d2.employee_id   = empid_in.get().strip()
-                d2.degree        = degree_in.get().strip()
-                d2.university    = univ_in.get().strip()
-                d2.certifications= cert_in.get().strip()
-                d2.work_address  = addr_in.get().strip()
-
+                db.execute(
+                    update(User).where(User.id == u.id).values(
+                        full_name=vals["Full Name"],
+                        email=vals["Email (login)"],
+                        phone=vals["Phone"],
+                    )
+                )
+                db.execute(
+                    update(Doctor).where(Doctor.id == d.id).values(
+                        specialty=vals["Specialty"] or "General",
+                        license_no=vals["License No"],
+                        designation=vals["Designation / Title"],
+                        years_exp=years_val,
+                        employee_id=vals["Employee ID"],
+                        degree=vals["Degree"],
+                        university=vals["University"],
+                        certifications=vals["Certifications"],
+                        work_address=vals["Work Address"],
+                    )
+                )
                 db.commit()
 
-            # refresh local caches & header
-            if hasattr(self.controller, "current_user"):
-                self.controller.current_user.full_name = full_in.get().strip()
-                self.controller.current_user.email     = email_in.get().strip()
-                self.controller.current_user.phone     = phone_in.get().strip()
+                # refresh local caches & header
+                if hasattr(self.controller, "current_user"):
+                    self.controller.current_user.full_name = vals["Full Name"]
+                    self.controller.current_user.email     = vals["Email (login)"]
+                    self.controller.current_user.phone     = vals["Phone"]
 
-            self._load_doctor()
+                self._doctor_cache_for_user_id = None  # profile changed: force a re-read
+                self._load_doctor(db)
             try:
                 self.set_user(self.controller.current_user)
             except Exception:
                 pass
 
             try:
-                self._refresh_schedule()
-                self._refresh_kpis()
-                self.refresh_checkins()
+                self._refresh_all()
             except Exception:
                 pass
 
@@ -487,6 +841,8 @@ class DoctorFrame(BaseFrame):
             title, w = heads[c]
             self.tree_ap.heading(c, text=title)
             self.tree_ap.column(c, width=w)
+        if not self._show_checkins:
+            self.tree_ap.configure(displaycolumns=col[:-1])
         self.tree_ap.grid(row=0, column=0, sticky="nsew")
 
         # Attach scrollbars (pack-free; no bottom clipping)
@@ -572,7 +928,7 @@ class DoctorFrame(BaseFrame):
         # selection → snapshot/labels
         self._current_patient_id: int | None = None
         self._current_appt_id: int | None = None
-        self.tree_ap.bind("<<TreeviewSelect>>", lambda e: self._load_snapshot_from_selection())
+        self.tree_ap.bind("<<TreeviewSelect>>", self._on_appt_select)
         self.tree_ap.bind("<Double-1>", lambda e: self._open_patient())
 
     # ---------------- Availability tab (logic retained) ------------------
@@ -740,11 +1096,21 @@ class DoctorFrame(BaseFrame):
         except Exception:
             return None
 
-    def _refresh_schedule(self):
-        # clear table
-        for i in self.tree_ap.get_children():
-            self.tree_ap.delete(i)
+    def _refresh_schedule(self, db=None):
+        """Reload the Appointments table.
+
+        Filters are read here on the Tk thread; the query runs on self._io and
+        the rows come back through after(). With an explicit `db` the load runs
+        inline on that session instead.
+        """
+        # a direct refresh supersedes any pending debounced one
+        if self._search_after_id:
+            self.after_cancel(self._search_after_id)
+            self._search_after_id = None
+        self._sched_seq += 1  # results of any in-flight load are now stale
+        seq = self._sched_seq
         if not self.doctor:
+            self._apply_schedule_rows([])
             return
 
         # Determine mode (fallback to "By Date" behavior if f_mode isn't present)
@@ -759,74 +1125,182 @@ class DoctorFrame(BaseFrame):
             # date from sidebar (only when By Date)
             date_str = (self.f_date.get() or "").strip()
             try:
-                day0 = datetime.strptime(date_str, DAY_FMT).replace(hour=0, minute=0, second=0, microsecond=0)
+                day0, day1 = _day_range(datetime.strptime(date_str, DAY_FMT))
             except ValueError:
                 messagebox.showerror("Invalid date", "Use YYYY-MM-DD")
                 return
-            day1 = day0 + timedelta(days=1)
 
         status = self.f_status.get()
         q = (self.f_search.get() or "").strip().lower()
+        args = (self.doctor.id, day0, day1, status, q, self._show_checkins)
 
-        with SessionLocal() as db:
-            # base query: this doctor
-            stmt = (
-                select(Appointment)
-                .options(selectinload(Appointment.patient).selectinload(Patient.user))
-                .where(Appointment.doctor_id == self.doctor.id)
-                .order_by(Appointment.scheduled_for.asc())
+        if db is not None:
+            self._apply_schedule_rows(self._load_schedule_rows(db, *args))
+            return
+
+        def _work():
+            with SessionLocal() as s:
+                return self._load_schedule_rows(s, *args)
+
+        fut = self._io.submit(_work)
+        fut.add_done_callback(lambda f: self.after(0, self._on_schedule_loaded, seq, f))
+
+    def _on_schedule_loaded(self, seq: int, fut):
+        if seq != self._sched_seq:
+            return  # a newer refresh was started meanwhile
+        try:
+            rows = fut.result()
+        except Exception as e:
+            print("DoctorFrame schedule refresh error:", e)
+            return
+        self._apply_schedule_rows(rows, chunk=100)
+
+    @staticmethod
+    def _load_schedule_rows(db, doctor_id: int, day0, day1, status: str, q: str,
+                            with_checkins: bool = True) -> list[tuple]:
+        """Query the schedule and return plain table tuples (safe to run off the Tk thread)."""
+        # plain column select (no ORM instances); patient name via outer joins and the
+        # check-in flag as a correlated EXISTS, so one round-trip covers the whole table.
+        # Built from lambdas so SQLAlchemy caches the compiled SQL per statement shape and
+        # each refresh only rebinds doctor/date/status/search parameters.
+        if with_checkins:
+            stmt = lambda_stmt(lambda: select(
+                Appointment.id, Appointment.scheduled_for, User.full_name, User.email,
+                Appointment.reason, Appointment.status,
+                exists().where(Attendance.appointment_id == Appointment.id).label("checked_in"),
+            ))
+        else:  # column hidden: skip the per-row attendance probe
+            stmt = lambda_stmt(lambda: select(
+                Appointment.id, Appointment.scheduled_for, User.full_name, User.email,
+                Appointment.reason, Appointment.status,
+                literal(False).label("checked_in"),
+            ))
+        stmt += lambda s: (
+            s.outerjoin(Patient, Patient.id == Appointment.patient_id)
+            .outerjoin(User, User.id == Patient.user_id)
+            .where(Appointment.doctor_id == doctor_id)
+            .order_by(Appointment.scheduled_for.asc())
+        )
+        # add date window only in "By Date" mode
+        if day0 and day1:
+            stmt += lambda s: s.where(
+                Appointment.scheduled_for >= day0,
+                Appointment.scheduled_for < day1,
             )
-            # add date window only in "By Date" mode
-            if use_by_date and day0 and day1:
-                stmt = stmt.where(
-                    Appointment.scheduled_for >= day0,
-                    Appointment.scheduled_for < day1,
-                )
 
-            # status filter
-            if status and status != "(any)":
-                try:
-                    stmt = stmt.where(Appointment.status == AppointmentStatus(status))
-                except Exception:
-                    pass
-
-            appts = db.scalars(stmt).all()
-
-            # check-ins just for the loaded appointments
-            ap_ids = [a.id for a in appts]
-            checked_ids: set[int] = set()
-            if ap_ids:
-                checked_ids = set(
-                    db.scalars(
-                        select(Attendance.appointment_id).where(Attendance.appointment_id.in_(ap_ids))
-                    ).all()
-                )
+        # status filter ("(any)" and unknown values aren't in the map → no filter)
+        st = _STATUS_MAP.get(status)
+        if st is not None:
+            stmt += lambda s: s.where(Appointment.status == st)
+
+        # search filter (patient name/email or reason) in SQL, not on fetched rows
+        if q:
+            like = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            stmt += lambda s: s.where(or_(
+                User.full_name.ilike(like, escape="\\"),
+                User.email.ilike(like, escape="\\"),
+                Appointment.reason.ilike(like, escape="\\"),
+            ))
+
+        fmt = _fmt_dt
+        return [
+            (
+                r.id,
+                fmt(r.scheduled_for),
+                r.full_name or r.email or "",
+                r.reason or "",
+                r.status.value if r.status else "",  # Enum column: always a member (or NULL)
+                "yes" if r.checked_in else "",
+            )
+            for r in db.execute(stmt)
+        ]
 
-            # search filter + populate rows
-            for a in appts:
-                patient_label = (a.patient.user.full_name or a.patient.user.email) if a.patient and a.patient.user else ""
-                if q and (q not in (patient_label or "").lower()) and (q not in (a.reason or "").lower()):
-                    continue
-                self.tree_ap.insert(
-                    "", "end",
-                    values=(
-                        a.id,
-                        a.scheduled_for.strftime(DATE_FMT),
-                        patient_label,
-                        a.reason or "",
-                        getattr(a.status, "value", str(a.status)),
-                        "yes" if a.id in checked_ids else "",
-                    )
-                )
+    def _apply_schedule_rows(self, rows: list[tuple], chunk: int = 0):
+        """Tk thread only: bring the Appointments table in line with `rows`.
 
+        Rows are keyed by appointment id (also used as the Treeview iid), so only
+        added, removed and changed rows cost a Tcl call; selection and scroll
+        position survive a refresh. With `chunk`, rows are applied `chunk` at a
+        time with an after(1) between batches so the window keeps painting while
+        a large day fills in; a newer apply first finishes any batch in progress.
+        """
+        pending, self._ap_apply = self._ap_apply, None
+        if pending is not None:
+            for _ in pending:
+                pass
+        it = self._schedule_apply_steps(rows)
+        if not chunk:
+            for _ in it:
+                pass
+            return
+        self._ap_apply = it
+
+        def _step():
+            if self._ap_apply is not it:
+                return
+            try:
+                done = sum(1 for _ in itertools.islice(it, chunk)) < chunk
+            except tk.TclError:  # tree destroyed mid-apply
+                done = True
+            if done:
+                self._ap_apply = None
+            else:
+                self.after(1, _step)
+
+        _step()
+
+    def _schedule_apply_steps(self, rows: list[tuple]):
+        """Generator behind _apply_schedule_rows; yields once per row of `rows`."""
+        tree = self.tree_ap
+        old = self._ap_rows
+        new = {r[0]: r for r in rows}
+
+        gone = [str(i) for i in old.keys() - new.keys()]
+        if gone:
+            tree.delete(*gone)
+        # surviving rows only need moving if their relative order changed (e.g. reschedule)
+        kept_old = [i for i in old if i in new]
+        kept_new = [i for i in new if i in old]
+        reorder = kept_old != kept_new
+
+        # straight Tcl calls skip ttk's per-call option formatting; the scrollbar
+        # is detached so it isn't redrawn once per inserted row
+        yscroll = tree.cget("yscrollcommand")
+        tree.configure(yscrollcommand="")
+        try:
+            call, w = tree.tk.call, tree._w
+            for idx, (ap_id, values) in enumerate(new.items()):
+                prev = old.get(ap_id)
+                if prev is None:
+                    call(w, "insert", "", idx, "-id", str(ap_id), "-values", values)
+                else:
+                    if prev != values:
+                        call(w, "item", str(ap_id), "-values", values)
+                    if reorder:
+                        tree.move(str(ap_id), "", idx)
+                yield
+        finally:
+            tree.configure(yscrollcommand=yscroll)
+            self._ap_rows = new
 
     def _load_snapshot_from_selection(self):
+        """Reload the Patient Snapshot pane for the selected appointment.
+
+        The queries run on self._io and the widgets are filled back on the Tk
+        thread; a newer selection makes an in-flight result stale.
+        """
+        # a direct load supersedes any pending debounced one
+        if self._snap_after_id:
+            self.after_cancel(self._snap_after_id)
+            self._snap_after_id = None
+        self._snap_seq += 1
+        seq = self._snap_seq
         appt_id = self._selected_appt_id()
         self._current_appt_id = appt_id
+        self._current_patient_id = None  # set again once the snapshot lands
 
         # clear banner & fields when nothing selected
         if not appt_id:
-            self._current_patient_id = None
             self.snap_lbl.config(text="No patient selected")
             try:
                 self.sel_appt_lbl.config(text="Selected: –")
@@ -837,53 +1311,110 @@ class DoctorFrame(BaseFrame):
             self.snap_recent.delete(0, "end")
             return
 
-        with SessionLocal() as db:
-            a = db.get(Appointment, appt_id)
-            if not a:
-                return
-            p = db.get(Patient, a.patient_id)
-            u = db.get(User, p.user_id) if p else None
-
-            self._current_patient_id = p.id if p else None
-            patient_label = (u.full_name or u.email) if u else "Unknown"
+        def _work():
+            with SessionLocal() as s:
+                return self._fetch_snapshot(s, appt_id)
 
-            label = f"{patient_label} — MRN:{getattr(p, 'mrn', '-') or '-'}  " \
-                    f"DOB:{getattr(p, 'dob', '-') or '-'}  Phone:{getattr(u, 'phone', '-') or '-'}"
-            self.snap_lbl.config(text=label)
+        fut = self._io.submit(_work)
+        fut.add_done_callback(lambda f: self.after(0, self._on_snapshot_loaded, seq, f))
 
-            # “Selected:” banner above quick actions
-            try:
-                self.sel_appt_lbl.config(
-                    text=f"Selected: Appt #{a.id} — {a.scheduled_for:%Y-%m-%d %H:%M} — {patient_label}"
+    def _on_snapshot_loaded(self, seq: int, fut):
+        if seq != self._snap_seq:
+            return  # selection moved on meanwhile
+        try:
+            snap = fut.result()
+        except Exception as e:
+            print("DoctorFrame snapshot load error:", e)
+            return
+        self._apply_snapshot(snap)
+
+    @staticmethod
+    def _fetch_snapshot(db, appt_id: int) -> dict | None:
+        """All snapshot data for one appointment as plain values (safe off the Tk thread)."""
+        # appointment + patient + user in one joined round-trip
+        a = db.execute(
+            select(Appointment)
+            .options(*_loader_opts(_APPT_PATIENT_USER_JOINED))
+            .where(Appointment.id == appt_id)
+        ).scalar_one_or_none()
+        if not a:
+            return None
+        p = a.patient
+        u = p.user if p else None
+
+        patient_label = (u.full_name or u.email) if u else "Unknown"
+        mrn, dob = (p.mrn or "-", p.dob or "-") if p else ("-", "-")
+        phone = (u.phone or "-") if u else "-"
+
+        # recent prescriptions & notes: both top-5 lists in one UNION ALL round-trip,
+        # projected down to (kind, created_at, first 60 chars of the display text)
+        parts = [
+            select(
+                literal("rx").label("kind"),
+                Prescription.created_at,
+                func.substr(func.coalesce(
+                    func.nullif(Prescription.text, ""),
+                    func.nullif(Prescription.medication, ""),
+                    "Prescription",
+                ), 1, 60).label("txt"),
+            )
+            .where(Prescription.appointment_id == a.id)
+            .order_by(Prescription.created_at.desc())
+            .limit(5)
+            .subquery()
+        ]
+        if p:
+            parts.append(
+                select(
+                    literal("note").label("kind"),
+                    MedicalRecord.created_at,
+                    func.substr(func.coalesce(MedicalRecord.text, ""), 1, 60).label("txt"),
                 )
-            except Exception:
-                pass
+                .where(MedicalRecord.patient_id == p.id)
+                .order_by(MedicalRecord.created_at.desc())
+                .limit(5)
+                .subquery()
+            )
+        recent = union_all(*(select(sq) for sq in parts)).subquery()
+        # "rx" sorts after "note": Rx block first, newest first within each block
+        prefix = {"rx": "Rx", "note": "Note"}
+        return {
+            "patient_id": p.id if p else None,
+            "banner": f"{patient_label} — MRN:{mrn}  DOB:{dob}  Phone:{phone}",
+            "selected": f"Selected: Appt #{a.id} — {_fmt_dt(a.scheduled_for)} — {patient_label}",
+            "allergies": (p.allergies or "") if p else "",
+            "conditions": (p.chronic_conditions or "") if p else "",
+            "recent": [
+                f"{prefix[kind]} {created_at.date().isoformat()}: {txt}"
+                for kind, created_at, txt in db.execute(
+                    select(recent).order_by(recent.c.kind.desc(), recent.c.created_at.desc())
+                )
+            ],
+        }
+
+    def _apply_snapshot(self, snap: dict | None):
+        """Tk thread only: fill the snapshot widgets from _fetch_snapshot's result."""
+        if snap is None:
+            return
+        self._current_patient_id = snap["patient_id"]
+        self.snap_lbl.config(text=snap["banner"])
 
-            # Allergies / Conditions (editable inputs)
-            self.snap_allerg.delete("1.0", "end")
-            self.snap_allerg.insert("end", getattr(p, "allergies", "") or "")
+        # “Selected:” banner above quick actions
+        try:
+            self.sel_appt_lbl.config(text=snap["selected"])
+        except Exception:
+            pass
 
-            self.snap_cond.delete("1.0", "end")
-            self.snap_cond.insert("end", getattr(p, "chronic_conditions", "") or "")
+        # Allergies / Conditions (editable inputs)
+        self.snap_allerg.delete("1.0", "end")
+        self.snap_allerg.insert("end", snap["allergies"])
 
-            # recent prescriptions & notes
-            self.snap_recent.delete(0, "end")
-            rx_rows = db.scalars(
-                select(Prescription)
-                .where(Prescription.appointment_id == a.id)
-                .order_by(Prescription.created_at.desc())
-            ).all()
-            for r in rx_rows[:5]:
-                label = r.text or r.medication or "Prescription"
-                self.snap_recent.insert("end", f"Rx {r.created_at:%Y-%m-%d}: {label[:60]}")
+        self.snap_cond.delete("1.0", "end")
+        self.snap_cond.insert("end", snap["conditions"])
 
-            note_rows = db.scalars(
-                select(MedicalRecord)
-                .where(MedicalRecord.patient_id == p.id)
-                .order_by(MedicalRecord.created_at.desc())
-            ).all()
-            for n in note_rows[:5]:
-                self.snap_recent.insert("end", f"Note {n.created_at:%Y-%m-%d}: {n.text[:60]}")
+        # one Tcl insert for the whole Recent list
+        self.snap_recent.delete(0, "end")
+        self.snap_recent.insert("end", *snap["recent"])
 
     # Quick actions (Appointments tab) — logic unchanged
     def _open_patient(self):
@@ -896,15 +1427,20 @@ class DoctorFrame(BaseFrame):
             return
 
         with SessionLocal() as db:
-            a = db.get(Appointment, appt_id)
+            # appointment + patient + user in one joined round-trip
+            a = db.execute(
+                select(Appointment)
+                .options(*_loader_opts(_APPT_PATIENT_USER_JOINED))
+                .where(Appointment.id == appt_id)
+            ).scalar_one_or_none()
             if not a:
                 messagebox.showerror("Not found", "Appointment not found.")
                 return
-            p = db.get(Patient, a.patient_id)
+            p = a.patient
             if not p:
                 messagebox.showerror("Not found", "Patient not found.")
                 return
-            u = db.get(User, p.user_id) if p else None
+            u = p.user
 
             top = tk.Toplevel(self)
             top.title(f"Patient — {(u.full_name or u.email) if u else 'Patient'}")
@@ -944,18 +1480,22 @@ class DoctorFrame(BaseFrame):
             rows = db.scalars(
                 select(MedicalRecord).where(MedicalRecord.patient_id == p.id).order_by(MedicalRecord.created_at.desc())
             ).all()
-            for r in rows:
-                who = "Dr" if r.author_role == RecordAuthor.doctor else "Pt"
-                rec_list.insert("end", f"{r.created_at:%Y-%m-%d} [{who}] {r.text[:80]}")
+            # one Tcl insert per list instead of one per row
+            who = {RecordAuthor.doctor: "Dr"}
+            rec_list.insert("end", *[
+                f"{r.created_at.date().isoformat()} [{who.get(r.author_role, 'Pt')}] {r.text[:80]}"
+                for r in rows
+            ])
 
             rx_list = tk.Listbox(rxf, height=10)
             rx_list.pack(fill="both", expand=True)
             rx_rows = db.scalars(
                 select(Prescription).where(Prescription.appointment_id == a.id).order_by(Prescription.created_at.desc())
             ).all()
-            for r in rx_rows:
-                label = r.text or r.medication or "Prescription"
-                rx_list.insert("end", f"{r.created_at:%Y-%m-%d}  {label[:80]}")
+            rx_list.insert("end", *[
+                f"{r.created_at.date().isoformat()}  {(r.text or r.medication or 'Prescription')[:80]}"
+                for r in rx_rows
+            ])
 
             # ---------- Disciplinary Records (unchanged) ----------
             discf = ttk.LabelFrame(main, text="Disciplinary Records", padding=8)
@@ -972,48 +1512,51 @@ class DoctorFrame(BaseFrame):
             ttk.Label(right, text="Severity").grid(row=2, column=0, sticky="w")
             disc_sev = ttk.Combobox(
                 right, state="readonly",
-                values=[s.value for s in DisciplinarySeverity], width=20
+                values=_DISC_SEV_VALUES, width=20
             ); disc_sev.grid(row=3, column=0, sticky="w", pady=(2, 6))
 
             ttk.Label(right, text="Status").grid(row=4, column=0, sticky="w")
             disc_status = ttk.Combobox(
                 right, state="readonly",
-                values=[s.value for s in DisciplinaryStatus], width=20
+                values=_DISC_STATUS_VALUES, width=20
             ); disc_status.grid(row=5, column=0, sticky="w", pady=(2, 6))
 
             ttk.Label(right, text="Description").grid(row=6, column=0, sticky="w")
             disc_desc = tk.Text(right, height=4, width=36); disc_desc.grid(row=7, column=0, sticky="ew", pady=(2, 6))
 
-            def _disc_load():
+            disc_ids: list[int] = []  # record id per Listbox row, in display order
+
+            def _disc_load(db2=None):
                 disc_list.delete(0, "end")
-                with SessionLocal() as db2:
-                    rows2 = db2.query(DisciplinaryRecord)\
-                               .filter(DisciplinaryRecord.patient_id == p.id)\
-                               .order_by(DisciplinaryRecord.created_at.desc()).all()
+                with _read_session(db2) as db2:
+                    rows2 = db2.scalars(
+                        select(DisciplinaryRecord)
+                        .where(DisciplinaryRecord.patient_id == p.id)
+                        .order_by(DisciplinaryRecord.created_at.desc())
+                        .limit(200)  # newest 200 is plenty for a Listbox
+                    ).all()
+                    disc_ids[:] = [r.id for r in rows2]
                     for r in rows2:
-                        disc_list.insert("end", f"{r.id} • {r.created_at:%Y-%m-%d} • {r.severity.value} • {r.title[:50]}")
+                        disc_list.insert("end", f"{r.id} • {r.created_at.date().isoformat()} • {r.severity.value} • {r.title[:50]}")
 
             def _disc_clear_form():
                 disc_title.delete(0, "end")
-                disc_sev.set(DisciplinarySeverity.low.value)
-                disc_status.set(DisciplinaryStatus.open.value)
+                disc_sev.set(_DISC_LOW)
+                disc_status.set(_DISC_OPEN)
                 disc_desc.delete("1.0", "end")
 
             def _disc_on_select(_e=None):
                 sel = disc_list.curselection()
                 if not sel:
                     return
-                try:
-                    rec_id = int(disc_list.get(sel[0]).split(" • ", 1)[0])
-                except Exception:
-                    return
+                rec_id = disc_ids[sel[0]]
                 with SessionLocal() as db2:
                     r = db2.get(DisciplinaryRecord, rec_id)
                     if not r:
                         return
                     disc_title.delete(0, "end"); disc_title.insert(0, r.title or "")
-                    disc_sev.set(getattr(r.severity, "value", str(r.severity)) or DisciplinarySeverity.low.value)
-                    disc_status.set(getattr(r.status, "value", str(r.status)) or DisciplinaryStatus.open.value)
+                    disc_sev.set(getattr(r.severity, "value", str(r.severity)) or _DISC_LOW)
+                    disc_status.set(getattr(r.status, "value", str(r.status)) or _DISC_OPEN)
                     disc_desc.delete("1.0", "end"); disc_desc.insert("end", r.description or "")
 
             def _disc_save_new():
@@ -1021,8 +1564,8 @@ class DoctorFrame(BaseFrame):
                 if not t:
                     messagebox.showwarning("Missing", "Enter a title.")
                     return
-                sev = disc_sev.get() or DisciplinarySeverity.low.value
-                st  = disc_status.get() or DisciplinaryStatus.open.value
+                sev = disc_sev.get() or _DISC_LOW
+                st  = disc_status.get() or _DISC_OPEN
                 desc = disc_desc.get("1.0", "end").strip()
                 with SessionLocal() as db2:
                     rec = DisciplinaryRecord(
@@ -1041,17 +1584,13 @@ class DoctorFrame(BaseFrame):
                 if not sel:
                     messagebox.showwarning("No selection", "Pick a record from the list.")
                     return
-                try:
-                    rec_id = int(disc_list.get(sel[0]).split(" • ", 1)[0])
-                except Exception:
-                    messagebox.showerror("Error", "Could not parse selection.")
-                    return
+                rec_id = disc_ids[sel[0]]
                 t = (disc_title.get() or "").strip()
                 if not t:
                     messagebox.showwarning("Missing", "Enter a title.")
                     return
-                sev = disc_sev.get() or DisciplinarySeverity.low.value
-                st  = disc_status.get() or DisciplinaryStatus.open.value
+                sev = disc_sev.get() or _DISC_LOW
+                st  = disc_status.get() or _DISC_OPEN
                 desc = disc_desc.get("1.0", "end").strip()
                 with SessionLocal() as db2:
                     r = db2.get(DisciplinaryRecord, rec_id)
@@ -1071,11 +1610,7 @@ class DoctorFrame(BaseFrame):
                 if not sel:
                     messagebox.showwarning("No selection", "Pick a record from the list.")
                     return
-                try:
-                    rec_id = int(disc_list.get(sel[0]).split(" • ", 1)[0])
-                except Exception:
-                    messagebox.showerror("Error", "Could not parse selection.")
-                    return
+                rec_id = disc_ids[sel[0]]
                 if not messagebox.askyesno("Delete", "Delete selected record?"):
                     return
                 with SessionLocal() as db2:
@@ -1093,9 +1628,9 @@ class DoctorFrame(BaseFrame):
             ttk.Button(btnrow, text="Update Selected", command=_disc_update).pack(side="left")
             ttk.Button(btnrow, text="Delete Selected", command=_disc_delete).pack(side="left", padx=6)
 
-            # init defaults + load list
+            # init defaults + load list (on the dialog's session; reloads use their own)
             _disc_clear_form()
-            _disc_load()
+            _disc_load(db)
 
             # ---------- Add note / Rx inline ----------
             qa = ttk.LabelFrame(main, text="Add Note / Prescription", padding=8)
@@ -1141,7 +1676,7 @@ class DoctorFrame(BaseFrame):
                 freq = freq_e.get().strip()
                 dur  = dur_e.get().strip()
                 note = note_e.get().strip()
-                text = f"Medication: {med}; Dose: {dose}; Frequency: {freq}; Duration: {dur}; Notes: {note}"
+                text = _format_rx(med, dose, freq, dur, note)
                 with SessionLocal() as db2:
                     rx = Prescription(appointment_id=a.id, text=text)
                     db2.add(rx); db2.commit()
@@ -1160,12 +1695,7 @@ class DoctorFrame(BaseFrame):
         appt_id = self._selected_appt_id()
         if not appt_id:
             return
-        with SessionLocal() as db:
-            a = db.get(Appointment, appt_id)
-            if a:
-                a.status = AppointmentStatus.completed
-                db.commit()
-        self._refresh_schedule()
+        self._set_appt_status(appt_id, AppointmentStatus.completed)
 
     def _cancel_appt(self):
         appt_id = self._selected_appt_id()
@@ -1173,11 +1703,15 @@ class DoctorFrame(BaseFrame):
             return
         if not messagebox.askyesno("Cancel", "Cancel selected appointment?"):
             return
+        self._set_appt_status(appt_id, AppointmentStatus.cancelled)
+
+    def _set_appt_status(self, appt_id: int, status: AppointmentStatus):
+        """One UPDATE by id (no SELECT + dirty-tracking round-trip), then refresh."""
         with SessionLocal() as db:
-            a = db.get(Appointment, appt_id)
-            if a:
-                a.status = AppointmentStatus.cancelled
-                db.commit()
+            db.execute(update(Appointment).where(Appointment.id == appt_id).values(status=status))
+            db.commit()
+        if self.doctor:
+            _drop_appt_cache(self.doctor.id)
         self._refresh_schedule()
 
     def _resched_appt(self):
@@ -1187,17 +1721,16 @@ class DoctorFrame(BaseFrame):
             return
 
         with SessionLocal() as db:
-            ap = db.get(Appointment, appt_id)
-            if not ap:
-                return
-            current_dt = ap.scheduled_for
+            current_dt = db.scalar(select(Appointment.scheduled_for).where(Appointment.id == appt_id))
+        if current_dt is None:
+            return
 
         top = tk.Toplevel(self)
         top.title(f"Reschedule #{appt_id}")
         top.transient(self.winfo_toplevel())
         top.grab_set()
 
-        ttk.Label(top, text=f"Current: {current_dt:%Y-%m-%d %H:%M}").grid(row=0, column=0, columnspan=2, sticky="w", padx=8, pady=(8, 2))
+        ttk.Label(top, text=f"Current: {_fmt_dt(current_dt)}").grid(row=0, column=0, columnspan=2, sticky="w", padx=8, pady=(8, 2))
 
         ttk.Label(top, text="New Date").grid(row=1, column=0, sticky="w", padx=8)
         # Use topmost calendar popup
@@ -1217,7 +1750,8 @@ class DoctorFrame(BaseFrame):
             except ValueError:
                 messagebox.showerror("Invalid", "Use YYYY-MM-DD")
                 return
-            slots = AppointmentService.get_available_slots(self.doctor.id, day)
+            # flipping between dates reuses _SLOT_CACHE instead of re-running the queries
+            slots = _free_slots(self.doctor.id, day)
             # allow keeping same slot if same day
             cur_s = current_dt.strftime("%H:%M")
             if day.date() == current_dt.date() and cur_s not in slots:
@@ -1247,24 +1781,18 @@ class DoctorFrame(BaseFrame):
                 messagebox.showwarning("Past time", "Please pick a future time.")
                 return
             with SessionLocal() as db:
-                a = db.get(Appointment, appt_id)
+                a = db.get(Appointment, appt_id, options=_loader_opts())
                 if not a:
                     top.destroy(); return
                 if a.scheduled_for == new_when:
                     top.destroy(); return
-                conflict = db.scalar(
-                    select(Appointment.id).where(
-                        Appointment.doctor_id == a.doctor_id,
-                        Appointment.scheduled_for == new_when,
-                        Appointment.id != appt_id,
-                        Appointment.status != AppointmentStatus.cancelled,
-                    )
-                )
+                conflict = _slot_taken(db, a.doctor_id, new_when, appt_id)
                 if conflict:
+                    _drop_slot_cache(a.doctor_id, new_when.date())  # cached list is stale; refetch next time
                     messagebox.showerror("Taken", "That time is already booked.")
                     return
                 a.scheduled_for = new_when
-                db.commit()
+                db.commit()  # after_flush drops this doctor's cached slots
             top.destroy()
             self._refresh_schedule()
 
@@ -1275,8 +1803,8 @@ class DoctorFrame(BaseFrame):
         if not appt_id:
             return
         with SessionLocal() as db:
-            att = Attendance(appointment_id=appt_id, checkin_method=AttendanceMethod.web)
-            db.add(att); db.commit()
+            db.execute(insert(Attendance).values(appointment_id=appt_id, checkin_method=AttendanceMethod.web))
+            db.commit()
         self._refresh_schedule()
 
     def _undo_checkin(self):
@@ -1289,9 +1817,8 @@ class DoctorFrame(BaseFrame):
         self._refresh_schedule()
 
     def _save_note(self):
-        if not self._current_patient_id:
-            self._load_snapshot_from_selection()
-        if not self._current_patient_id:
+        appt_id = self._current_appt_id
+        if not appt_id:
             messagebox.showwarning("No patient", "Select an appointment first.")
             return
         text = self.note_txt.get("1.0", "end").strip()
@@ -1299,8 +1826,13 @@ class DoctorFrame(BaseFrame):
             messagebox.showwarning("Missing", "Enter a note.")
             return
         with SessionLocal() as db:
+            # the patient comes from the selected appointment, not the (debounced) snapshot
+            patient_id = db.scalar(select(Appointment.patient_id).where(Appointment.id == appt_id))
+            if not patient_id:
+                messagebox.showwarning("No patient", "Select an appointment first.")
+                return
             rec = MedicalRecord(
-                patient_id=self._current_patient_id,
+                patient_id=patient_id,
                 author_user_id=self.controller.current_user.id,
                 author_role=RecordAuthor.doctor,
                 text=text,
@@ -1311,8 +1843,6 @@ class DoctorFrame(BaseFrame):
         self._load_snapshot_from_selection()
 
     def _save_rx(self):
-        if not self._current_appt_id:
-            self._load_snapshot_from_selection()
         appt_id = self._current_appt_id
         if not appt_id:
             messagebox.showwarning("No selection", "Select an appointment first.")
@@ -1325,7 +1855,7 @@ class DoctorFrame(BaseFrame):
         freq = self.rx_freq.get().strip()
         dur  = self.rx_dur.get().strip()
         note = self.rx_note.get().strip()
-        text = f"Medication: {med}; Dose: {dose}; Frequency: {freq}; Duration: {dur}; Notes: {note}"
+        text = _format_rx(med, dose, freq, dur, note)
         with SessionLocal() as db:
             rx = Prescription(appointment_id=appt_id, text=text)
             db.add(rx); db.commit()
@@ -1337,19 +1867,22 @@ class DoctorFrame(BaseFrame):
     # ====================================================
     # Data ops — Availability
     # ====================================================
-    def _refresh_availability(self):
-        for i in self.tree_av.get_children():
-            self.tree_av.delete(i)
+    def _refresh_availability(self, db=None):
+        if not self._tab_ready(self.tab_avail):
+            return
         if not self.doctor:
+            sync_tree(self.tree_av, ())
             return
-        with SessionLocal() as db:
-            rows = db.scalars(
-                select(DoctorAvailability)
-                .where(DoctorAvailability.doctor_id == self.doctor.id)
-                .order_by(DoctorAvailability.day.asc())
-            ).all()
-            for r in rows:
-                self.tree_av.insert("", "end", values=(r.id, r.day.strftime(DAY_FMT), r.start_time, r.end_time, r.slot_minutes))
+        with _read_session(db) as db:
+            rows = [
+                (r.id, r.day.date().isoformat(), r.start_time, r.end_time, r.slot_minutes)
+                for r in db.scalars(
+                    select(DoctorAvailability)
+                    .where(DoctorAvailability.doctor_id == self.doctor.id)
+                    .order_by(DoctorAvailability.day.asc())
+                )
+            ]
+        sync_tree(self.tree_av, rows)
 
     def _on_select_availability(self):
         """When a row is selected, prefill the form for easy editing."""
@@ -1404,36 +1937,13 @@ class DoctorFrame(BaseFrame):
             messagebox.showerror("Invalid range", "Start time must be before End time")
             return
 
-        # upsert per-day rule (index-friendly)
-        day0, day1 = _day_range(day)
+        # replace the per-day rule (index-friendly)
+        day0, _ = _day_range(day)
         with SessionLocal() as db:
-            existing = db.scalar(
-                select(DoctorAvailability)
-                .where(
-                    DoctorAvailability.doctor_id == self.doctor.id,
-                    DoctorAvailability.day >= day0,
-                    DoctorAvailability.day < day1,
-                )
-                .order_by(DoctorAvailability.id.desc())
-            )
-            if existing:
-                existing.start_time   = start_s
-                existing.end_time     = end_s
-                existing.slot_minutes = slot_i
-                existing.day          = day0
-                action = "updated"
-            else:
-                db.add(
-                    DoctorAvailability(
-                        doctor_id=self.doctor.id,
-                        day=day0,
-                        start_time=start_s,
-                        end_time=end_s,
-                        slot_minutes=slot_i,
-                    )
-                )
-                action = "added"
+            replaced = _replace_availability(db, self.doctor.id, day0, [(start_s, end_s, slot_i)])
+            action = "updated" if replaced else "added"
             db.commit()
+        _drop_appt_cache(self.doctor.id)  # free slots follow the rule
         self._refresh_availability()
         messagebox.showinfo("Saved", f"Availability {action} for {day.strftime(DAY_FMT)}: {start_s}-{end_s} ({slot_i} min)")
 
@@ -1442,13 +1952,13 @@ class DoctorFrame(BaseFrame):
         if not sel:
             messagebox.showwarning("No selection", "Choose a rule to delete.")
             return
-        av_id = int(self.tree_av.item(sel[0], "values")[0])
+        av_id = int(sel[0])  # iid is the rule id
         if not messagebox.askyesno("Delete", "Delete selected availability rule?"):
             return
         with SessionLocal() as db:
-            av = db.get(DoctorAvailability, av_id)
-            if av:
-                db.delete(av); db.commit()
+            db.execute(delete(DoctorAvailability).where(DoctorAvailability.id == av_id))
+            db.commit()
+        _drop_appt_cache(self.doctor.id)
         self._refresh_availability()
 
     # ====================================================
@@ -1458,30 +1968,37 @@ class DoctorFrame(BaseFrame):
         sel = self.tree_req.selection()
         if not sel:
             return None
-        return int(self.tree_req.item(sel[0], "values")[0])
+        return int(sel[0])  # iid is the appointment id
 
-    def _refresh_requests(self):
-        for i in self.tree_req.get_children():
-            self.tree_req.delete(i)
+    def _refresh_requests(self, db=None):
+        if not self._tab_ready(self.tab_requests):
+            return
         if not self.doctor:
+            sync_tree(self.tree_req, ())
             return
-        with SessionLocal() as db:
+        with _read_session(db) as db:
+            # just the columns the table shows, patient name via joins: one round-trip, no ORM objects
             stmt = (
-                select(Appointment)
-                .options(selectinload(Appointment.patient).selectinload(Patient.user))
-                .where(Appointment.doctor_id == self.doctor.id)
+                select(
+                    Appointment.id,
+                    Appointment.scheduled_for,
+                    Appointment.reason,
+                    User.full_name,
+                    User.email,
+                )
+                .outerjoin(Patient, Patient.id == Appointment.patient_id)
+                .outerjoin(User, User.id == Patient.user_id)
+                .where(
+                    Appointment.doctor_id == self.doctor.id,
+                    Appointment.status == AppointmentStatus.requested,
+                )
                 .order_by(Appointment.scheduled_for.asc())
             )
-            appts = db.scalars(stmt).all()
-            for a in appts:
-                s_val = getattr(a.status, "value", str(a.status)).lower()
-                if s_val != "requested":
-                    continue
-                patient_label = a.patient.user.full_name or a.patient.user.email
-                self.tree_req.insert(
-                    "", "end",
-                    values=(a.id, a.scheduled_for.strftime(DATE_FMT), patient_label, a.reason or "")
-                )
+            rows = [
+                (ap_id, _fmt_dt(when), full_name or email or "", reason or "")
+                for ap_id, when, reason, full_name, email in db.execute(stmt)
+            ]
+        sync_tree(self.tree_req, rows)
 
     def _approve_request(self):
         appt_id = self._selected_request_id()
@@ -1489,18 +2006,11 @@ class DoctorFrame(BaseFrame):
             messagebox.showwarning("No selection", "Select a request.")
             return
         with SessionLocal() as db:
-            ap = db.get(Appointment, appt_id)
+            ap = db.get(Appointment, appt_id, options=_loader_opts())
             if not ap:
                 return
             # ensure requested time is still free
-            conflict = db.scalar(
-                select(Appointment.id).where(
-                    Appointment.doctor_id == ap.doctor_id,
-                    Appointment.scheduled_for == ap.scheduled_for,
-                    Appointment.id != ap.id,
-                    Appointment.status != AppointmentStatus.cancelled,
-                )
-            )
+            conflict = _slot_taken(db, ap.doctor_id, ap.scheduled_for, ap.id)
             if conflict:
                 messagebox.showinfo("Taken", "Requested time is no longer free. Use 'Assign Slot…' to pick another.")
                 return
@@ -1517,12 +2027,11 @@ class DoctorFrame(BaseFrame):
             return
 
         with SessionLocal() as db:
-            ap = db.get(Appointment, appt_id)
+            ap = db.get(Appointment, appt_id, options=_loader_opts(_APPT_PATIENT_USER))
             if not ap:
                 return
             current_dt = ap.scheduled_for
-            p = db.get(Patient, ap.patient_id)
-            u = db.get(User, p.user_id) if p else None
+            u = ap.patient.user if ap.patient else None
             patient_label = (u.full_name or u.email) if u else f"Patient#{ap.patient_id}"
 
         top = tk.Toplevel(self)
@@ -1531,7 +2040,7 @@ class DoctorFrame(BaseFrame):
         top.grab_set()
 
         ttk.Label(top, text=f"Patient: {patient_label}").grid(row=0, column=0, columnspan=3, sticky="w", padx=8, pady=(8, 2))
-        ttk.Label(top, text=f"Requested: {current_dt:%Y-%m-%d %H:%M}").grid(row=1, column=0, columnspan=3, sticky="w", padx=8, pady=(0, 6))
+        ttk.Label(top, text=f"Requested: {_fmt_dt(current_dt)}").grid(row=1, column=0, columnspan=3, sticky="w", padx=8, pady=(0, 6))
 
         ttk.Label(top, text="Date").grid(row=2, column=0, sticky="w", padx=8)
         de = ttk.Entry(top, width=16)
@@ -1550,7 +2059,7 @@ class DoctorFrame(BaseFrame):
             except ValueError:
                 messagebox.showerror("Invalid", "Use YYYY-MM-DD")
                 return
-            slots = AppointmentService.get_available_slots(self.doctor.id, day)
+            slots = _free_slots(self.doctor.id, day)
             time_cmb["values"] = slots
             if slots:
                 time_cmb.current(0)
@@ -1575,23 +2084,17 @@ class DoctorFrame(BaseFrame):
                 messagebox.showwarning("Past time", "Please pick a future time.")
                 return
             with SessionLocal() as db:
-                a = db.get(Appointment, appt_id)
+                a = db.get(Appointment, appt_id, options=_loader_opts())
                 if not a:
                     top.destroy(); return
-                conflict = db.scalar(
-                    select(Appointment.id).where(
-                        Appointment.doctor_id == a.doctor_id,
-                        Appointment.scheduled_for == new_when,
-                        Appointment.id != appt_id,
-                        Appointment.status != AppointmentStatus.cancelled,
-                    )
-                )
+                conflict = _slot_taken(db, a.doctor_id, new_when, appt_id)
                 if conflict:
+                    _drop_slot_cache(a.doctor_id, new_when.date())  # cached list is stale; refetch next time
                     messagebox.showerror("Taken", "That time is already booked.")
                     return
                 a.scheduled_for = new_when
                 a.status = AppointmentStatus.booked
-                db.commit()
+                db.commit()  # after_flush drops this doctor's cached slots
             top.destroy()
             self._refresh_requests()
             self._refresh_schedule()
@@ -1606,66 +2109,63 @@ class DoctorFrame(BaseFrame):
         if not messagebox.askyesno("Decline", "Decline this appointment request?"):
             return
         with SessionLocal() as db:
-            a = db.get(Appointment, appt_id)
-            if a:
-                a.status = AppointmentStatus.cancelled
-                db.commit()
+            db.execute(
+                update(Appointment).where(Appointment.id == appt_id).values(status=AppointmentStatus.cancelled)
+            )
+            db.commit()
+        if self.doctor:
+            _drop_appt_cache(self.doctor.id)
         self._refresh_requests()
 
     # ====================================================
     # Data ops — Notifications
     # ====================================================
-    def _refresh_notifications(self):
-        for i in self.tree_nf.get_children():
-            self.tree_nf.delete(i)
+    def _refresh_notifications(self, db=None):
         user = getattr(self.controller, "current_user", None)
         if not user:
             return
-        unread = 0
+        unread = [0]
+
+        def _badge():
+            title = "Notifications" if unread[0] == 0 else f"Notifications ({unread[0]})"
+            idx = self.nb.index(self.tab_notif)
+            self.nb.tab(idx, text=title)
+
+        if not self._tab_ready(self.tab_notif):
+            # list not built yet: keep the tab badge current with a COUNT only
+            with _read_session(db) as db:
+                unread[0] = db.scalar(
+                    select(func.count(Notification.id))
+                    .where(Notification.user_id == user.id, Notification.read.is_not(True))
+                ) or 0
+            _badge()
+            return
+
+        # history grows without bound: stream it in instead of materialising it all first
+        _feed_tree(self.tree_nf, self._iter_notification_rows(user.id, unread), on_done=_badge)
+
+    @staticmethod
+    def _iter_notification_rows(user_id: int, unread: list[int], batch: int = 200):
+        """Yield notification table rows, fetching `batch` at a time; counts unread into unread[0]."""
+        # Notification carries no appointment/patient/sender link, so the "From"
+        # column has nothing to resolve: select just the rendered columns
         with SessionLocal() as db:
-            rows = db.scalars(
-                select(Notification)
-                .where(Notification.user_id == user.id)
+            rows = db.execute(
+                select(Notification.id, Notification.created_at, Notification.title, Notification.read)
+                .where(Notification.user_id == user_id)
                 .order_by(Notification.created_at.desc())
-            ).all()
-            for n in rows:
-                who = "-"
-                ap_id = getattr(n, "appointment_id", None)
-                if ap_id:
-                    ap = db.get(Appointment, ap_id)
-                    if ap:
-                        p = db.get(Patient, ap.patient_id)
-                        if p:
-                            u = db.get(User, p.user_id)
-                            if u:
-                                who = u.full_name or u.email or "-"
-                elif getattr(n, "patient_id", None):
-                    p = db.get(Patient, n.patient_id)
-                    if p:
-                        u = db.get(User, p.user_id)
-                        if u:
-                            who = u.full_name or u.email or "-"
-                elif getattr(n, "from_user_id", None):
-                    u = db.get(User, n.from_user_id)
-                    if u:
-                        who = u.full_name or u.email or "-"
-
-                self.tree_nf.insert(
-                    "", "end",
-                    values=(n.id, n.created_at.strftime(DATE_FMT), getattr(n, "title", "(notification)"), who, "yes" if getattr(n, "read", False) else "")
-                )
-                if not getattr(n, "read", False):
-                    unread += 1
-        # badge
-        title = "Notifications" if unread == 0 else f"Notifications ({unread})"
-        idx = self.nb.index(self.tab_notif)
-        self.nb.tab(idx, text=title)
+                .execution_options(yield_per=batch)
+            )
+            for n_id, created_at, title, read in rows:
+                if not read:
+                    unread[0] += 1
+                yield (n_id, _fmt_dt(created_at), title, "-", "yes" if read else "")
 
     def _notif_mark_read(self):
         sel = self.tree_nf.selection()
         if not sel:
             return
-        notif_id = int(self.tree_nf.item(sel[0], "values")[0])
+        notif_id = int(sel[0])  # iid is the notification id
         with SessionLocal() as db:
             n = db.get(Notification, notif_id)
             if n:
@@ -1676,20 +2176,21 @@ class DoctorFrame(BaseFrame):
     # ====================================================
     # Data ops — Support
     # ====================================================
-    def _refresh_support(self):
-        for i in self.tree_tk.get_children():
-            self.tree_tk.delete(i)
+    def _refresh_support(self, db=None):
+        if not self._tab_ready(self.tab_support):
+            return
         user = getattr(self.controller, "current_user", None)
         if not user:
+            sync_tree(self.tree_tk, ())
             return
-        with SessionLocal() as db:
-            rows = db.scalars(
-                select(SupportTicket)
+        with _read_session(db) as db:
+            rows = db.execute(
+                select(SupportTicket.id, SupportTicket.created_at, SupportTicket.subject, SupportTicket.status)
                 .where(SupportTicket.user_id == user.id)
                 .order_by(SupportTicket.created_at.desc())
             ).all()
-            for t in rows:
-                self.tree_tk.insert("", "end", values=(t.id, t.created_at.strftime(DATE_FMT), t.subject, t.status.value))
+        sync_tree(self.tree_tk, [(t_id, _fmt_dt(created_at), subject, status.value)
+                                 for t_id, created_at, subject, status in rows])
 
     def _create_ticket(self):
         user = getattr(self.controller, "current_user", None)
@@ -1711,77 +2212,74 @@ class DoctorFrame(BaseFrame):
     # Data ops — KPIs
     # ====================================================
     def _refresh_kpis(self):
-        if not self.doctor:
+        if not self.doctor or not self._tab_ready(self.tab_kpi):
             return
-        day0, day1 = _day_range(datetime.now())
+        doctor_id = self.doctor.id
+        who = self.controller.current_user.full_name or self.controller.current_user.email
+        # DB work on a worker thread; the Text widget is only touched back on the Tk thread
+        run_in_thread(
+            work=lambda: self._load_kpi_text(doctor_id, who),
+            on_done=self._show_kpi_text,
+            on_error=lambda e: print("DoctorFrame KPI refresh error:", e),
+            tk_after=self.after,
+        )
 
+    @staticmethod
+    def _load_kpi_text(doctor_id: int, who: str) -> str:
+        """Build the KPI summary text (worker thread; no Tk access)."""
         with SessionLocal() as db:
-            appts = db.scalars(
-                select(Appointment)
-                .where(
-                    Appointment.doctor_id == self.doctor.id,
-                    Appointment.scheduled_for >= day0,
-                    Appointment.scheduled_for < day1,
-                )
-                .order_by(Appointment.scheduled_for.asc())
-            ).all()
-            total = len(appts)
-            completed = sum(1 for a in appts if getattr(a.status, "value", a.status) == "completed")
-            cancelled = sum(1 for a in appts if getattr(a.status, "value", a.status) == "cancelled")
-
-            ap_ids = [a.id for a in appts]
-            checked_in = 0
-            if ap_ids:
-                rows = db.execute(
-                    select(func.count(func.distinct(Attendance.appointment_id)))
-                    .where(Attendance.appointment_id.in_(ap_ids))
-                ).all()
-                checked_in = rows[0][0] if rows else 0
-
-            # utilisation (booked/total slots)
-            av = db.scalar(
-                select(DoctorAvailability)
-                .where(
-                    DoctorAvailability.doctor_id == self.doctor.id,
-                    DoctorAvailability.day >= day0,
-                    DoctorAvailability.day < day1,
-                )
-                .order_by(DoctorAvailability.id.desc())
-            )
-            start_h, start_m, end_h, end_m, slot_min = 9, 0, 17, 0, 30
-            if av:
-                try:
-                    start_h, start_m = map(int, av.start_time.split(":"))
-                    end_h, end_m = map(int, av.end_time.split(":"))
-                    slot_min = av.slot_minutes or 30
-                except Exception:
-                    pass
-            total_slots = 0
-            t = day0.replace(hour=start_h, minute=start_m)
-            end = day0.replace(hour=end_h, minute=end_m)
-            while t < end:
-                total_slots += 1
-                t += timedelta(minutes=slot_min)
-            booked = sum(1 for a in appts if getattr(a.status, "value", a.status) != "cancelled")
-            util = f"{booked}/{total_slots}" if total_slots else "n/a"
-
-            next_ap = next((a for a in appts if getattr(a.status, "value", a.status) != "cancelled"), None)
-            next_label = ""
-            if next_ap:
-                p = db.get(Patient, next_ap.patient_id)
-                u = db.get(User, p.user_id) if p else None
-                next_label = f"{next_ap.scheduled_for:%H:%M} — {(u.full_name or u.email) if u else 'Patient'}"
-
-        text = (
-            f"Doctor: {self.controller.current_user.full_name or self.controller.current_user.email}\n"
+            return DoctorFrame._kpi_text(db, doctor_id, who)
+
+    @staticmethod
+    def _fetch_kpis_and_checkins(doctor_id: int, who: str) -> tuple[str, list[tuple]]:
+        """KPI text and check-in table rows from a single session (worker thread)."""
+        with SessionLocal() as db:
+            text = DoctorFrame._kpi_text(db, doctor_id, who)
+            rows = [DoctorFrame._checkin_values(r) for r in today_checkin_rows(db)]
+        return text, rows
+
+    def _show_kpis_and_checkins(self, result: tuple[str, list[tuple]]):
+        text, rows = result
+        self._show_kpi_text(text)
+        self._show_checkin_rows(rows)
+
+    @staticmethod
+    def _kpi_text(db, doctor_id: int, who: str) -> str:
+        now = datetime.now()
+        day0, day1 = _day_range(now)
+
+        next_ap = _next_appt_today(db, doctor_id, day0, day1)
+        counts = _kpi_counts(db, doctor_id, day0, day1)
+
+        # utilisation (booked/total slots); the day's rule came back with the counts
+        start_h, start_m, end_h, end_m, slot_min = 9, 0, 17, 0, 30
+        if counts.av_start is not None:
+            try:
+                start_h, start_m = map(int, counts.av_start.split(":"))
+                end_h, end_m = map(int, counts.av_end.split(":"))
+                slot_min = counts.av_slot or 30
+            except Exception:
+                pass
+        total_slots = _slot_count(start_h, start_m, end_h, end_m, slot_min)
+        booked = counts.today - counts.cancelled
+        util = f"{booked}/{total_slots}" if total_slots else "n/a"
+
+        next_label = ""
+        if next_ap:
+            next_label = f"{next_ap[0].hour:02d}:{next_ap[0].minute:02d} — {next_ap[1] or 'Patient'}"
+
+        return (
+            f"Doctor: {who}\n"
             f"Date: {day0:%Y-%m-%d}\n\n"
-            f"Total bookings: {total}\n"
-            f"Checked-in: {checked_in}\n"
-            f"Completed: {completed}\n"
-            f"Cancelled: {cancelled}\n"
+            f"Total bookings: {counts.today}\n"
+            f"Checked-in: {counts.checked_in}\n"
+            f"Completed: {counts.completed}\n"
+            f"Cancelled: {counts.cancelled}\n"
             f"Utilisation (booked/slots): {util}\n"
             f"Next patient: {next_label or '-'}\n"
         )
+
+    def _show_kpi_text(self, text: str):
         self.kpi_summary.config(state="normal")
         self.kpi_summary.delete("1.0", "end")
         self.kpi_summary.insert("end", text)
@@ -1794,31 +2292,25 @@ class DoctorFrame(BaseFrame):
         """Populate the 'Today’s Staff Check-ins' table."""
         if not hasattr(self, "checkin_tv"):
             return
-        # clear table
-        for i in self.checkin_tv.get_children():
-            self.checkin_tv.delete(i)
-
         # fetch today’s check-ins
         rows = []
         try:
-            rows = today_checkins()  # expects objects with user, role, status, method, location, ts
+            rows = today_checkin_rows()
         except Exception as e:
-            print("today_checkins() failed:", e)
+            print("today_checkin_rows() failed:", e)
             rows = []
+        self._show_checkin_rows([self._checkin_values(r) for r in rows])
 
-        for r in rows:
-            who = getattr(r, "user", None)
-            who_label = getattr(who, "full_name", None) or getattr(who, "email", "Unknown")
-            ts = ""
-            try:
-                ts = r.ts.strftime("%H:%M") if getattr(r, "ts", None) else ""
-            except Exception:
-                pass
-            role = getattr(r, "role", "") or ""
-            status = getattr(getattr(r, "status", None), "value", getattr(r, "status", "")) or ""
-            method = getattr(getattr(r, "method", None), "value", getattr(r, "method", "")) or ""
-            location = getattr(r, "location", "") or ""
-            self.checkin_tv.insert("", "end", values=(ts, who_label, role, status, method, location))
+    @staticmethod
+    def _checkin_values(r) -> tuple:
+        """Table values for one today_checkin_rows() row (no Tk access; safe on a worker thread)."""
+        ts, who, role, status, method, location = r
+        return (ts.time().isoformat("minutes") if ts else "", who, role or "", status or "", method or "", location)
+
+    def _show_checkin_rows(self, rows: list[tuple]):
+        if not hasattr(self, "checkin_tv"):
+            return
+        fill_tree(self.checkin_tv, rows)
 
     # ====================================================
     # UI helpers — topmost calendar picker
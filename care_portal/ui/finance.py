@@ -6,17 +6,19 @@ from tkinter import ttk, messagebox
 
 from datetime import datetime
 
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.orm import joinedload
 from sqlalchemy.exc import SQLAlchemyError
 
 from ..db import SessionLocal
 from ..models import (
     Billing, BillingStatus, PaymentMethod,
     Payment, PaymentStatus,
-    Appointment, Patient
+    Appointment, Patient, User
 )
 from .base import BaseFrame
-from ..services.checkin import today_checkins
+from .utils import fill_tree, sync_tree, run_in_thread
+from ..services.checkin import today_checkin_rows
 from ..models import StaffCheckinStatus, StaffCheckinMethod
 
 class FinanceFrame(BaseFrame):
@@ -24,6 +26,8 @@ class FinanceFrame(BaseFrame):
 
     def __init__(self, parent, controller):
         super().__init__(parent, controller)
+        self._refreshing = False        # a worker load is in flight
+        self._refresh_pending = False   # another refresh was asked for meanwhile
 
         # Toolbar
         bar = ttk.Frame(self.body); bar.pack(fill="x", pady=(6, 6))
@@ -81,15 +85,28 @@ class FinanceFrame(BaseFrame):
         self.lbl_status = ttk.Label(self.body, text="")
         self.lbl_status.pack(anchor="w", pady=(4, 0))
 
+        # Today's staff check-ins
+        self.checkin_frame = ttk.LabelFrame(self.body, text="Today’s Staff Check-ins")
+        self.checkin_frame.pack(fill="x", pady=(8, 0))
+        cols = ("when", "name", "role", "status", "method", "location")
+        self.checkin_tv = ttk.Treeview(self.checkin_frame, columns=cols, show="headings", height=6)
+        for c in cols:
+            self.checkin_tv.heading(c, text=c.title())
+            self.checkin_tv.column(c, width=110, anchor="center")
+        self.checkin_tv.pack(fill="x", padx=6, pady=6)
+        ttk.Button(self.checkin_frame, text="Refresh", command=self.refresh_checkins).pack(pady=(0, 6))
+
     # ---------- hooks ----------
     def on_show(self):
         self.refresh_data()
+        self.refresh_checkins()
 
     # ---------- helpers ----------
     @staticmethod
     def _fmt_dt(dt):
+        # "YYYY-MM-DD HH:MM" via isoformat's C path (no strftime format parsing per row)
         try:
-            return dt.strftime("%Y-%m-%d %H:%M")
+            return dt.isoformat(sep=" ", timespec="minutes") if dt else ""
         except Exception:
             return ""
 
@@ -98,58 +115,117 @@ class FinanceFrame(BaseFrame):
         if not sel:
             return None
         try:
-            return int(self.tree_b.item(sel[0], "values")[0])
+            return int(sel[0])  # iid is the billing id
         except Exception:
             return None
 
     # ---------- data ops ----------
     def refresh_data(self):
-        self.tree_b.delete(*self.tree_b.get_children())
-        self.tree_p.delete(*self.tree_p.get_children())
+        # DB work on a worker thread; the trees are only touched back on the Tk thread
+        if self._refreshing:
+            self._refresh_pending = True
+            return
+        self._refreshing = True
+        run_in_thread(
+            work=self._load_finance_rows,
+            on_done=self._apply_finance_rows,
+            on_error=self._on_refresh_error,
+            tk_after=self.after,
+        )
+
+    @classmethod
+    def _load_finance_rows(cls) -> tuple[list[tuple], list[tuple]]:
+        """Invoice and payment table rows as plain tuples (worker thread; no Tk access)."""
+        with SessionLocal() as db:
+            # invoices
+            # appointment -> patient -> user joined in, so the loop below issues no SQL
+            bills = db.scalars(
+                select(Billing)
+                .options(joinedload(Billing.appointment).joinedload(Appointment.patient).joinedload(Patient.user))
+                .order_by(Billing.created_at.desc())
+            ).all()
+            bill_rows = []
+            for b in bills:
+                appt = b.appointment
+                pat_name = ""
+                if appt and appt.patient and appt.patient.user:
+                    pat_name = appt.patient.user.full_name
+                bill_rows.append((
+                    b.id,
+                    cls._fmt_dt(b.created_at),
+                    appt.id if appt else "",
+                    pat_name,
+                    b.description or "",
+                    f"{float(b.amount):.2f}",
+                    getattr(b.status, "value", b.status),
+                    getattr(b.payment_method, "value", b.payment_method) if b.payment_method else "",
+                ))
+
+            # payments
+            # Payment has no relationships: patient name via outer joins in the same SELECT
+            pays = db.execute(
+                select(Payment, User.full_name)
+                .outerjoin(Patient, Patient.id == Payment.patient_id)
+                .outerjoin(User, User.id == Patient.user_id)
+                .order_by(Payment.created_at.desc())
+            ).all()
+            pay_rows = [(
+                p.id,
+                cls._fmt_dt(p.created_at),
+                pat_name or "",
+                p.appointment_id or "",
+                f"{float(p.amount):.2f}",
+                p.method or "",
+                getattr(p.status, "value", p.status),
+                (p.notes or "")[:200],
+            ) for p, pat_name in pays]
+        return bill_rows, pay_rows
+
+    def _apply_finance_rows(self, result: tuple[list[tuple], list[tuple]]):
+        bill_rows, pay_rows = result
         try:
-            with SessionLocal() as db:
-                # invoices
-                bills = db.scalars(select(Billing).order_by(Billing.created_at.desc())).all()
-                bi = 0
-                for b in bills:
-                    appt = db.get(Appointment, b.appointment_id) if b.appointment_id else None
-                    pat_name = ""
-                    if appt and appt.patient and appt.patient.user:
-                        pat_name = appt.patient.user.full_name
-                    self.tree_b.insert("", "end", values=(
-                        b.id,
-                        self._fmt_dt(b.created_at),
-                        appt.id if appt else "",
-                        pat_name,
-                        b.description or "",
-                        f"{float(b.amount):.2f}",
-                        getattr(b.status, "value", b.status),
-                        getattr(b.payment_method, "value", b.payment_method) if b.payment_method else "",
-                    ))
-                    bi += 1
-
-                # payments
-                pays = db.scalars(select(Payment).order_by(Payment.created_at.desc())).all()
-                pi = 0
-                for p in pays:
-                    appt = db.get(Appointment, p.appointment_id) if p.appointment_id else None
-                    pat = db.get(Patient, p.patient_id) if p.patient_id else None
-                    pat_name = pat.user.full_name if pat and pat.user else ""
-                    self.tree_p.insert("", "end", values=(
-                        p.id,
-                        self._fmt_dt(p.created_at),
-                        pat_name,
-                        appt.id if appt else "",
-                        f"{float(p.amount):.2f}",
-                        p.method or "",
-                        getattr(p.status, "value", p.status),
-                        (p.notes or "")[:200],
-                    ))
-                    pi += 1
-
-                self.lbl_status.config(text=f"{bi} invoice(s), {pi} payment(s).")
-        except SQLAlchemyError as e:
+            sync_tree(self.tree_b, bill_rows)
+            sync_tree(self.tree_p, pay_rows)
+            self.lbl_status.config(text=f"{len(bill_rows)} invoice(s), {len(pay_rows)} payment(s).")
+        except tk.TclError:  # frame destroyed while the load was running
+            self._refresh_pending = False
+        finally:
+            self._refresh_done()
+
+    def _on_refresh_error(self, e: BaseException):
+        self._refresh_done()
+        if isinstance(e, SQLAlchemyError):
             messagebox.showerror("Finance", f"Load failed: {e}")
+        else:
+            print("FinanceFrame refresh error:", e)
+
+    def _refresh_done(self):
+        self._refreshing = False
+        if self._refresh_pending:
+            self._refresh_pending = False
+            self.refresh_data()
+
+    @staticmethod
+    def _update_billing(db, bid: int, **values):
+        """UPDATE one invoice; returns (appointment_id, amount, payment_method, patient_id) or None if it's gone.
+
+        A single UPDATE ... RETURNING where the dialect has it, else the UPDATE plus
+        one SELECT of the same columns — never a load-mutate-flush of the ORM row.
+        The patient id is read by appointment id afterwards: SQLite renders RETURNING
+        columns unqualified, which would leave a correlated subquery ambiguous.
+        """
+        cols = (Billing.appointment_id, Billing.amount, Billing.payment_method)
+        stmt = update(Billing).where(Billing.id == bid).values(**values)
+        if db.get_bind().dialect.update_returning:
+            b = db.execute(stmt.returning(*cols)).one_or_none()
+        elif db.execute(stmt).rowcount:
+            b = db.execute(select(*cols).where(Billing.id == bid)).one_or_none()
+        else:
+            b = None
+        if b is None:
+            return None
+        patient_id = db.scalar(select(Appointment.patient_id).where(Appointment.id == b.appointment_id))
+        return b.appointment_id, b.amount, b.payment_method, patient_id
 
     def mark_paid(self):
         bid = self._selected_billing_id()
@@ -158,20 +234,23 @@ class FinanceFrame(BaseFrame):
             return
         with SessionLocal() as db:
             try:
-                b = db.get(Billing, bid)
+                b = self._update_billing(
+                    db, bid,
+                    status=BillingStatus.paid,
+                    payment_method=PaymentMethod.online,
+                    paid_at=datetime.utcnow(),
+                )
                 if not b:
                     return
-                b.status = BillingStatus.paid
-                b.payment_method = PaymentMethod.online
-                b.paid_at = datetime.utcnow()
+                appt_id, amount, method, patient_id = b
                 # Also record a payment entry
                 p = Payment(
-                    appointment_id=b.appointment_id,
-                    patient_id=b.appointment.patient_id if b.appointment else None,
-                    amount=b.amount,
-                    method=b.payment_method.value if b.payment_method else "Online",
+                    appointment_id=appt_id,
+                    patient_id=patient_id,
+                    amount=amount,
+                    method=method.value if method else "Online",
                     status=PaymentStatus.paid,
-                    notes=f"Invoice {b.id} marked paid",
+                    notes=f"Invoice {bid} marked paid",
                 )
                 db.add(p)
                 db.commit()
@@ -187,17 +266,17 @@ class FinanceFrame(BaseFrame):
             return
         with SessionLocal() as db:
             try:
-                b = db.get(Billing, bid)
+                b = self._update_billing(db, bid, status=BillingStatus.refunded)
                 if not b:
                     return
-                b.status = BillingStatus.refunded
+                appt_id, amount, method, patient_id = b
                 db.add(Payment(
-                    appointment_id=b.appointment_id,
-                    patient_id=b.appointment.patient_id if b.appointment else None,
-                    amount=-abs(float(b.amount)),
-                    method=(b.payment_method.value if b.payment_method else "Online"),
+                    appointment_id=appt_id,
+                    patient_id=patient_id,
+                    amount=-abs(float(amount)),
+                    method=(method.value if method else "Online"),
                     status=PaymentStatus.paid,
-                    notes=f"Refund for invoice {b.id}",
+                    notes=f"Refund for invoice {bid}",
                 ))
                 db.commit()
                 self.refresh_data()
@@ -212,34 +291,20 @@ class FinanceFrame(BaseFrame):
             return
         with SessionLocal() as db:
             try:
-                b = db.get(Billing, bid)
-                if not b:
+                # nothing to read back: a plain UPDATE, no SELECT first
+                if not db.execute(
+                    update(Billing).where(Billing.id == bid).values(status=BillingStatus.cancelled)
+                ).rowcount:
                     return
-                b.status = BillingStatus.cancelled
                 db.commit()
                 self.refresh_data()
             except SQLAlchemyError as e:
                 db.rollback()
                 messagebox.showerror("Cancel", str(e))
-# In __init__:
-self.checkin_frame = ttk.LabelFrame(self, text="Today’s Staff Check-ins")
-self.checkin_frame.pack(fill="x", padx=8, pady=8)
-
-cols = ("when","name","role","status","method","location")
-self.checkin_tv = ttk.Treeview(self.checkin_frame, columns=cols, show="headings", height=6)
-for c in cols:
-    self.checkin_tv.heading(c, text=c.title())
-    self.checkin_tv.column(c, width=110, anchor="center")
-self.checkin_tv.pack(fill="x", padx=6, pady=6)
-
-ttk.Button(self.checkin_frame, text="Refresh", command=self.refresh_checkins).pack(pady=(0,6))
-
-# Add method:
-def refresh_checkins(self):
-    for i in self.checkin_tv.get_children():
-        self.checkin_tv.delete(i)
-    rows = today_checkins()
-    for r in rows:
-        who = getattr(r.user, "full_name", None) or getattr(r.user, "email", "Unknown")
-        ts = r.ts.strftime("%H:%M")
-        self.checkin_tv.insert("", "end", values=(ts, who, r.role, r.status.value, r.method.value, r.location or ""))
\ No newline at end of file
+
+    # ---------- staff check-ins ----------
+    def refresh_checkins(self):
+        fill_tree(self.checkin_tv, [
+            (ts.time().isoformat("minutes") if ts else "", who, role, status, method, location)
+            for ts, who, role, status, method, location in today_checkin_rows()
+        ])
@@ -41,7 +41,7 @@ try:
     HAS_DISCIPLINARY = True
 except Exception:
     HAS_DISCIPLINARY = False
-from ..services.notifications import notify_receptionists_about_request
+from ..services.notifications import notify_receptionists_about_request, send_bulk_notifications
 
 from ..services.appointments import AppointmentService
 from .base import BaseFrame
@@ -926,11 +926,8 @@ class PatientFrame(BaseFrame):
         """Notify the doctor user + all receptionists."""
         with SessionLocal() as db:
             doc_user_id = db.scalar(select(User.id).join(Doctor, Doctor.user_id == User.id).where(Doctor.id == doctor_id))
-            recp_ids = [u.id for u in db.scalars(select(User).where(User.role == Role.receptionist)).all()]
-            targets = set([doc_user_id] if doc_user_id else []).union(recp_ids)
-            for uid in targets:
-                db.add(Notification(user_id=uid, title=title, body=body))
-            db.commit()
+            recp_ids = db.scalars(select(User.id).where(User.role == Role.receptionist)).all()
+            send_bulk_notifications([doc_user_id, *recp_ids], title, body, db=db)
 
     def refresh_appointments(self):
         if not hasattr(self, "tree_ap") or not getattr(self, "patient", None):
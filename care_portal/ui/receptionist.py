@@ -1246,47 +1246,21 @@ class ReceptionistFrame(ttk.Frame):
         if not user:
             return
         unread = 0
+        # Notification carries no appointment/patient/sender link, so the "From"
+        # column has nothing to resolve: select just the rendered columns
         with SessionLocal() as db:
-            rows = db.scalars(
-                select(Notification)
+            rows = db.execute(
+                select(Notification.id, Notification.created_at, Notification.title, Notification.read)
                 .where(Notification.user_id == user.id)
                 .order_by(Notification.created_at.desc())
             ).all()
-            for n in rows:
-                # Resolve “who” from appointment/patient/from_user
-                who = "-"
-                ap_id = getattr(n, "appointment_id", None)
-                if ap_id:
-                    ap = db.get(Appointment, ap_id)
-                    if ap:
-                        p = db.get(Patient, ap.patient_id)
-                        if p:
-                            u = db.get(User, p.user_id)
-                            if u:
-                                who = u.full_name or u.email or "-"
-                elif getattr(n, "patient_id", None):
-                    p = db.get(Patient, n.patient_id)
-                    if p:
-                        u = db.get(User, p.user_id)
-                        if u:
-                            who = u.full_name or u.email or "-"
-                elif getattr(n, "from_user_id", None):
-                    u = db.get(User, n.from_user_id)
-                    if u:
-                        who = u.full_name or u.email or "-"
-
-                self.tv_nf.insert(
-                    "", "end",
-                    values=(
-                        n.id,
-                        n.created_at.strftime(DATE_FMT),
-                        getattr(n, "title", "(notification)"),
-                        who,
-                        "yes" if getattr(n, "read", False) else "",
-                    ),
-                )
-                if not getattr(n, "read", False):
-                    unread += 1
+        for n_id, created_at, title, read in rows:
+            self.tv_nf.insert(
+                "", "end", iid=str(n_id),
+                values=(n_id, created_at.strftime(DATE_FMT), title, "-", "yes" if read else ""),
+            )
+            if not read:
+                unread += 1
         self.nb.tab(self.tab_notif, text=("Notifications" if unread == 0 else f"Notifications ({unread})"))
 
     def _notif_open_selected(self):
@@ -1295,7 +1269,7 @@ class ReceptionistFrame(ttk.Frame):
             messagebox.showinfo("Open", "Select a notification first.")
             return
 
-        notif_id = int(self.tv_nf.item(sel[0], "values")[0])
+        notif_id = int(sel[0])  # iid is the notification id
         with SessionLocal() as db:
             n = db.get(Notification, notif_id)
             if not n:
@@ -1330,7 +1304,7 @@ class ReceptionistFrame(ttk.Frame):
         sel = self.tv_nf.selection()
         if not sel:
             return
-        notif_id = int(self.tv_nf.item(sel[0], "values")[0])
+        notif_id = int(sel[0])  # iid is the notification id
         with SessionLocal() as db:
             n = db.get(Notification, notif_id)
             if n:
@@ -21,6 +21,7 @@ from ..services.notifications import (
 
 class SupportFrame(BaseFrame):
     title = "Support"
+    use_native_scroll = True
 
     def __init__(self, parent, controller):
         super().__init__(parent, controller)
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import threading
 import traceback
-from typing import Callable, Any, Optional
+from typing import Callable, Any, Iterable, Optional
 
 def run_in_thread(
     *,
@@ -36,3 +36,76 @@ def run_in_thread(
 
     t = threading.Thread(target=_runner, daemon=True)
     t.start()
+
+
+def fill_tree(tree, rows: Iterable[tuple]) -> None:
+    """Replace all rows of a ttk.Treeview with `rows` (value tuples) in one pass.
+
+    Children are dropped with a single delete, rows go in as raw Tcl inserts, and
+    the scrollbar is detached meanwhile so it isn't redrawn per row.
+    """
+    tree.delete(*tree.get_children())
+    yscroll = tree.cget("yscrollcommand")
+    tree.configure(yscrollcommand="")
+    try:
+        call, w = tree.tk.call, tree._w
+        for values in rows:
+            call(w, "insert", "", "end", "-values", values)
+    finally:
+        tree.configure(yscrollcommand=yscroll)
+
+
+class TreeSync:
+    """Incremental refill of a ttk.Treeview whose rows are keyed by the DB id in their first value.
+
+    Feed the new rows in display order with add(), then call finish(). The item
+    iid is str(id): new ids are inserted in place, changed rows are updated,
+    rows already showing the same values are left alone, and ids that no longer
+    appear are deleted at the end. The last values written are kept on the tree
+    itself (tree._synced), so they go away with the widget.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.cache: dict[str, tuple] = tree.__dict__.setdefault("_synced", {})
+        self.old_pos = {iid: i for i, iid in enumerate(tree.get_children())}
+        self.seen: set[str] = set()
+        self.prev: Optional[str] = None
+        self.last = -1
+
+    def add(self, values: tuple) -> None:
+        tree = self.tree
+        iid = str(values[0])
+        self.seen.add(iid)
+        pos = self.old_pos.get(iid)
+        if pos is not None and pos < self.last:
+            # order changed (rare): re-place it right after the previous row
+            tree.delete(iid)
+            pos = None
+        if pos is None:
+            if not self.old_pos:
+                index = "end"  # first fill: plain appends
+            else:
+                index = tree.index(self.prev) + 1 if self.prev is not None else 0
+            tree.tk.call(tree._w, "insert", "", index, "-id", iid, "-values", values)
+        else:
+            if self.cache.get(iid) != values:
+                tree.tk.call(tree._w, "item", iid, "-values", values)
+            self.last = pos
+        self.cache[iid] = values
+        self.prev = iid
+
+    def finish(self) -> None:
+        stale = [iid for iid in self.old_pos if iid not in self.seen]
+        if stale:
+            self.tree.delete(*stale)
+        for iid in stale:
+            self.cache.pop(iid, None)
+
+
+def sync_tree(tree, rows: Iterable[tuple]) -> None:
+    """Bring a Treeview up to date with `rows`, touching only rows that changed (see TreeSync)."""
+    sync = TreeSync(tree)
+    for values in rows:
+        sync.add(values)
+    sync.finish()
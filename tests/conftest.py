@@ -0,0 +1,79 @@
+# tests/conftest.py
+from __future__ import annotations
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from care_portal.db import Base, count_queries  # noqa: E402
+from care_portal.models import (  # noqa: E402
+    User, Role, Doctor, Patient,
+    Appointment, AppointmentStatus, Attendance,
+    DoctorAvailability, Prescription, MedicalRecord,
+)
+
+N_PATIENTS = 8
+N_APPOINTMENTS = 16  # enough rows that a per-row lazy load blows any budget
+
+
+@pytest.fixture
+def engine(tmp_path):
+    eng = create_engine(f"sqlite:///{tmp_path / 'care_portal_test.db'}", future=True)
+    Base.metadata.create_all(eng)
+    yield eng
+    eng.dispose()
+
+
+@pytest.fixture
+def seeded(engine):
+    """A doctor with a full day of appointments, check-ins, Rx, notes and an availability rule."""
+    Session = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False, future=True)
+    day0 = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    statuses = [AppointmentStatus.booked, AppointmentStatus.completed,
+                AppointmentStatus.cancelled, AppointmentStatus.requested]
+    with Session() as db:
+        du = User(email="doc@test", full_name="Doc Test", role=Role.doctor, password_hash="x")
+        db.add(du); db.flush()
+        doctor = Doctor(user_id=du.id); db.add(doctor); db.flush()
+
+        patients = []
+        for i in range(N_PATIENTS):
+            u = User(email=f"pat{i}@test", full_name=f"Patient {i}", role=Role.patient,
+                     password_hash="x", phone="555")
+            db.add(u); db.flush()
+            p = Patient(user_id=u.id, mrn=f"MRN{i}", allergies="none")
+            db.add(p); db.flush()
+            patients.append(p)
+
+        appts = []
+        for i in range(N_APPOINTMENTS):
+            a = Appointment(
+                patient_id=patients[i % N_PATIENTS].id, doctor_id=doctor.id,
+                scheduled_for=day0.replace(hour=8) + timedelta(minutes=30 * i),
+                reason=f"visit {i}", status=statuses[i % len(statuses)],
+            )
+            db.add(a); appts.append(a)
+        db.flush()
+
+        for a in appts[::3]:
+            db.add(Attendance(appointment_id=a.id))
+        db.add(DoctorAvailability(doctor_id=doctor.id, day=day0, start_time="09:00",
+                                  end_time="17:00", slot_minutes=30))
+        first = appts[0]
+        for i in range(6):
+            db.add(Prescription(patient_id=first.patient_id, appointment_id=first.id, text=f"rx {i}"))
+            db.add(MedicalRecord(patient_id=first.patient_id, author_user_id=du.id, text=f"note {i}"))
+        db.commit()
+        yield Session, doctor.id, first.id, day0
+
+
+@pytest.fixture
+def queries(engine):
+    """`with queries() as q:` collects every statement run on the test engine."""
+    return lambda: count_queries(engine)
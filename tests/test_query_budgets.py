@@ -0,0 +1,44 @@
+# tests/test_query_budgets.py
+"""Per-flow SQL statement budgets for the doctor dashboard (N+1 regression guard)."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from care_portal.ui.doctor import DoctorFrame, _drop_appt_cache
+
+SCHEDULE_BUDGET = 1   # one column SELECT for the whole table
+KPI_BUDGET = 2        # next-patient probe + one conditional aggregate
+SNAPSHOT_BUDGET = 2   # appointment/patient/user join + Rx/notes UNION ALL
+
+
+def test_schedule_rows_budget(seeded, queries):
+    Session, doctor_id, _, day0 = seeded
+    with Session() as db, queries() as q:
+        rows = DoctorFrame._load_schedule_rows(db, doctor_id, day0, day0 + timedelta(days=1), "(any)", "")
+    assert len(rows) > SCHEDULE_BUDGET
+    assert len(q) <= SCHEDULE_BUDGET, q
+
+
+def test_schedule_rows_filtered_budget(seeded, queries):
+    Session, doctor_id, _, day0 = seeded
+    with Session() as db, queries() as q:
+        DoctorFrame._load_schedule_rows(db, doctor_id, day0, day0 + timedelta(days=1), "booked", "patient")
+    assert len(q) <= SCHEDULE_BUDGET, q
+
+
+def test_kpi_text_budget(seeded, queries):
+    Session, doctor_id, _, _ = seeded
+    _drop_appt_cache(doctor_id)  # measure the uncached path
+    with Session() as db, queries() as q:
+        text = DoctorFrame._kpi_text(db, doctor_id, "Doc Test")
+    assert "Total bookings:" in text
+    assert len(q) <= KPI_BUDGET, q
+
+
+def test_snapshot_budget(seeded, queries):
+    Session, _, appt_id, _ = seeded
+    with Session() as db, queries() as q:
+        snap = DoctorFrame._fetch_snapshot(db, appt_id)
+    assert snap["patient_id"]
+    assert len(snap["recent"]) > SNAPSHOT_BUDGET
+    assert len(q) <= SNAPSHOT_BUDGET, q